@@ -68,6 +68,9 @@ OPTIMIZED_INSERTION = True
 STATIC_ERRORS = True
 TYPECHECK_IMPORTS = True
 TYPECHECK_LIBRARY = False
+CLOSED_WORLD = False
+INFER_RETURNS = False
+INFER_RETURNS_ROUNDS = 10
 SEMANTICS = 'TRANS'
 OUTPUT_AST = False
 IMPORT_DEPTH = 15
@@ -88,6 +91,8 @@ def defaults(more=None):
             'semantics':SEMANTICS,
             'output_ast':OUTPUT_AST,
             'typecheck_imports':TYPECHECK_IMPORTS,
+            'closed_world':CLOSED_WORLD,
+            'infer_returns':INFER_RETURNS,
             'die_on_static_error':DIE_ON_STATIC_ERROR
             })
     if more != None:
@@ -101,10 +106,16 @@ def set(args):
     global SEMANTICS
     global OUTPUT_AST
     global TYPECHECK_IMPORTS
+    global CLOSED_WORLD
+    global INFER_RETURNS
     global DIE_ON_STATIC_ERROR
     WARNINGS = int(args.warnings[0])
     STATIC_ERRORS = args.static_errors
     SEMANTICS = args.semantics
     OUTPUT_AST = args.output_ast
     TYPECHECK_IMPORTS = args.typecheck_imports
+    # Return types are only inferred for functions that nothing can
+    # rebind, which only holds in a closed world
+    CLOSED_WORLD = args.closed_world or args.infer_returns
+    INFER_RETURNS = args.infer_returns
     DIE_ON_STATIC_ERROR = args.die_on_static_error
@@ -30,6 +30,107 @@ class Killfinder(SetGatheringVisitor):
     def visitClassDef(self, n):
         return set()
 
+# Every name bound anywhere in a module, in any scope, once per binding
+class Bindingfinder(ListGatheringVisitor):
+    examine_functions = True
+    def visitName(self, n):
+        return [n.id] if not isinstance(n.ctx, ast.Load) else []
+    def visitFunctionDef(self, n):
+        return [n.name] + super().visitFunctionDef(n)
+    def visitarguments(self, n):
+        def argname(arg):
+            return arg if isinstance(arg, str) else getattr(arg, 'arg', None)
+        params = n.args + getattr(n, 'kwonlyargs', [])
+        params = [argname(arg) for arg in params] + [argname(n.vararg), argname(n.kwarg)]
+        return [name for name in params if name] + super().visitarguments(n)
+    def visitClassDef(self, n):
+        return [n.name] + super().visitClassDef(n)
+    def visitImport(self, n):
+        return [alias.asname if alias.asname else alias.name.split('.')[0] for alias in n.names]
+    visitImportFrom = visitImport
+    def visitGlobal(self, n):
+        return n.names
+    visitNonlocal = visitGlobal
+    def visitExceptHandler(self, n):
+        name = [n.name] if isinstance(n.name, str) else []
+        return name + super().visitExceptHandler(n)
+
+# Set gatherer that also descends into nodes the other visitors
+# ignore, such as call keywords and annotated assignments
+class ExhaustiveSetVisitor(SetGatheringVisitor):
+    examine_functions = True
+    def default(self, n, *args):
+        if not isinstance(n, ast.AST):
+            return set()
+        return self.reduce_expr(list(ast.iter_child_nodes(n)), *args)
+    visitCall = default
+
+# Every identifier a module could use to reach a definition in another
+# module: names, attributes, imported members and strings
+class Referencefinder(ExhaustiveSetVisitor):
+    def visitName(self, n):
+        return {n.id}
+    def visitAttribute(self, n):
+        return {n.attr} | self.dispatch(n.value)
+    def visitImportFrom(self, n):
+        return {alias.name for alias in n.names}
+    def visitStr(self, n):
+        return {n.s}
+
+# String constants, any of which might name a global
+class Stringfinder(ExhaustiveSetVisitor):
+    def visitStr(self, n):
+        return {n.s}
+
+# Functions whose use would hide calls from a closed-world analysis
+dynamic_scope = {'globals', 'locals', 'vars', 'eval', 'exec'}
+
+# Names in a module used other than as the function of a call with
+# positional arguments only, and strings that might name them. Calling
+# one of the functions above is a use of it however it's called, and
+# so is reaching one of them as an attribute (builtins.eval)
+class Escapefinder(ExhaustiveSetVisitor):
+    def visitName(self, n):
+        return {n.id} if isinstance(n.ctx, ast.Load) else set()
+    def visitAttribute(self, n):
+        return ({n.attr} & dynamic_scope) | self.dispatch(n.value)
+    def visitCall(self, n):
+        if isinstance(n.func, ast.Name) and not n.keywords and \
+                not getattr(n, 'starargs', None) and not getattr(n, 'kwargs', None) and \
+                not any(isinstance(arg, ast.Starred) for arg in n.args):
+            return ({n.func.id} & dynamic_scope) | self.reduce_expr(n.args)
+        else: return self.default(n)
+    def visitStr(self, n):
+        return {n.s}
+
+# Names assigned in a function's own scope, not in nested scopes
+class Localfinder(SetGatheringVisitor):
+    examine_functions = False
+    def visitName(self, n):
+        return {n.id} if isinstance(n.ctx, ast.Store) else set()
+    def visitcomprehension(self, n):
+        return self.combine_expr(self.dispatch(n.iter), self.reduce_expr(n.ifs))
+
+# Names declared global or nonlocal anywhere, including nested scopes
+class Globalfinder(ExhaustiveSetVisitor):
+    def visitGlobal(self, n):
+        return set(n.names)
+    visitNonlocal = visitGlobal
+
+# Whether statements define a scope that may run after they finish
+class Deferredfinder(BooleanOrVisitor):
+    examine_functions = False
+    def visitFunctionDef(self, n):
+        return True
+    visitLambda = visitClassDef = visitGeneratorExp = visitFunctionDef
+
+# Whether a function body is a generator's
+class Yieldfinder(BooleanOrVisitor):
+    examine_functions = False
+    def visitYield(self, n):
+        return True
+    visitYieldFrom = visitYield
+
 class Inheritfinder(SetGatheringVisitor):
     examine_functions = False
     def visitClassDef(self, n):
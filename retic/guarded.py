@@ -1,10 +1,11 @@
 from . import typing, rtypes
-import inspect
+import inspect, weakref
 from .runtime import tyinstance as retic_tyinstance, has_type as retic_has_type, \
     has_shape as retic_has_shape, pinstance as retic_pinstance
 from .relations import merge as retic_merge, n_info_join as retic_meet, subcompat as retic_subcompat
 from .exc import UnimplementedException as ReticUnimplementedException, RuntimeTypeError
-from .rproxy import create_proxy as retic_create_proxy
+from .rproxy import create_proxy as retic_create_proxy, instantiate as retic_instantiate_proxy, \
+    get_state as retic_proxy_state, is_proxy as retic_is_proxy
 
 class CastError(RuntimeTypeError):
     pass
@@ -37,8 +38,6 @@ def retic_assert(bool, val, msg, exc=None):
 def retic_cast(val, src, trg, msg, line=None):
     if src == trg:
         return val
-    if line == None:
-        line = inspect.currentframe().f_back.f_lineno
     if retic_tyinstance(trg, rtypes.Dyn):
         if retic_tyinstance(src, rtypes.Function):
             return retic_cast(val, src, retic_dynfunc(src), msg, line=line)
@@ -110,32 +109,37 @@ def retic_cast(val, src, trg, msg, line=None):
         raise ReticUnimplementedException(src, trg)
 
 
-def retic_proxy(val, src, meet, trg, msg, line, call=None, meta=False):
-    Proxy = retic_create_proxy(val)
+def retic_proxy(val, src, meet, trg, msg, line, call=None, steps=None):
+    Proxy = retic_create_proxy(val, retic_proxy_hooks, retic_proxy_slots)
 
-    typegen = isinstance(val, type) and not meta
-
-    if typegen:
-        meta = retic_proxy(val, src, meet, trg, msg, line, call=call,meta=True)
+    if isinstance(val, type):
         try:
-            class Proxy(val, metaclass=meta):
+            class Proxy(val, metaclass=Proxy):
+                __actual__ = val
+                __threesome__ = src, meet, trg
+                __retic_message__ = msg
+                __retic_line__ = line
+                __retic_steps__ = steps
+                __retic_call__ = call
+                __retic_members__ = {}
                 def __new__(cls, *args, **kwd):
                     return call.__get__(cls)(*args, **kwd)
         except TypeError:
-            class Proxy(type, metaclass=meta):
+            class Proxy(type, metaclass=Proxy):
+                __actual__ = val
+                __threesome__ = src, meet, trg
+                __retic_message__ = msg
+                __retic_line__ = line
+                __retic_steps__ = steps
+                __retic_call__ = call
+                __retic_members__ = {}
                 def __new__(cls, *args, **kwd):
                     return call.__get__(cls)(*args, **kwd)
         return Proxy
 
-    Proxy.__actual__ = val
-    Proxy.__threesome__ = src, meet, trg
-    Proxy.__getattribute__ = retic_make_getattr(val, src, meet, trg, msg, line, function=call)
-    Proxy.__setattr__ = retic_make_setattr(val, src, meet, trg, msg, line)
-    Proxy.__delattr__ = retic_make_delattr(val, src, meet, trg, msg, line)
-    if not meta:
-        return Proxy()
-    else:
-        return Proxy
+    return retic_instantiate_proxy(Proxy, val, __actual__=val, __threesome__=(src, meet, trg),
+                                   __retic_message__=msg, __retic_line__=line, __retic_steps__=steps,
+                                   __retic_call__=call, __retic_members__={})
 
 # def retic_create_threesome(val, src, trg, msg, line):
 #     threesome = threesomes.Threesome(src, retic_meet(src,trg), trg)
@@ -149,7 +153,7 @@ def retic_proxy(val, src, meet, trg, msg, line, call=None, meta=False):
 
 def retic_check_threesome(val, src, trg, msg, line):
 # The above definition is progress towards working with new threesomes. This is a backport
-    if type(val).__name__ == 'Proxy' and hasattr(val, '__actual__'):
+    if retic_is_proxy(val) and hasattr(val, '__actual__'):
         nsrc, tm, _  = val.__threesome__
         meet = retic_meet(tm, src, trg)
         actual = val.__actual__
@@ -166,30 +170,44 @@ def retic_get_actual(val):
     else: return val
 
 def retic_make_function_wrapper(val, src, trg, msg, line):
+    prox = retic_cached_proxy(val, src, trg, msg, line)
+    if prox is not None:
+        return prox
+    orig, osrc = val, src
     base_val, base_src, meet = retic_check_threesome(val, src, trg, msg, line)
 #    base_val, threesome = retic_create_threesome(val, src, trg, msg, line)
 
-    src_fmls = src.froms
-    src_ret = src.to
-    trg_fmls = trg.froms
-    trg_ret = trg.to
+    # If val is already a function wrapper, call what it wraps directly,
+    # applying the casts of its wrapper and then this one, rather than
+    # wrapping the wrapper, so a function is guarded by at most one
+    # wrapper. Each cast keeps its own blame, and a cast that repeats one
+    # already applied further along the way an argument or result flows
+    # can't fail, so it's dropped and the chain stays bounded.
+    arg_steps = ((trg.froms, src.froms, msg, line),)
+    ret_steps = ((src.to, trg.to, msg, line),)
+    steps = retic_proxy_state(val, '__retic_steps__') if base_val is not val else None
+    if steps is not None and not isinstance(base_val, type) and \
+            retic_tyinstance(base_src, rtypes.Function) and retic_tyinstance(meet, rtypes.Function):
+        val = base_val
+        inner_args, inner_rets = steps
+        arg_steps += tuple(step for step in inner_args if step[:2] != arg_steps[0][:2])
+        ret_steps = inner_rets + tuple(step for step in ret_steps if \
+                                           not any(step[:2] == inner[:2] for inner in inner_rets))
 
-    fml_len = max(src_fmls.len(), trg_fmls.len())
+    fml_lens = [(fmls.len(), fmsg) for outer, inner, fmsg, _ in arg_steps \
+                    for fmls in (outer, inner) if fmls.len() != -1]
     bi = inspect.isbuiltin(base_val) or (hasattr(base_val, '__self__') and not hasattr(base_val, '__func__'))
+    arg_casts = [retic_arg_casts(*step) for step in arg_steps]
+    ret_plan = sum((retic_cast_plan([(src_ret, retic_merge(src_ret, trg_ret))], rmsg, rline) \
+                        for src_ret, trg_ret, rmsg, rline in ret_steps), ())
 
     def wrapper(self, *args, **kwds):
-        kwc = len(args)
-        ckwds = {}
-        if retic_pinstance(src_fmls, rtypes.NamedParameters):
-            for k in kwds:
-                if k in [k for k, _ in src_fmls.parameters]:
-                    kwc -= 1
-                    ckwds[k] = retic_cast(kwds[k], rtypes.Dyn, dict(src_fmls.parameters)[k], msg, line=line)
-                else: ckwds[k] = kwds[k]
-        if fml_len != -1:
-            retic_assert(len(args)+len(kwds) == fml_len, val, msg)
-        cargs = [ retic_mergecast(arg, trg, src, msg, line=line)\
-                      for arg, trg, src in zip(args, trg_fmls.types(len(args)+len(kwds))[:kwc], src_fmls.types(len(args)+len(kwds))[:kwc]) ]
+        argc = len(args)+len(kwds)
+        for fml_len, fmsg in fml_lens:
+            retic_assert(argc == fml_len, val, fmsg)
+        cargs, ckwds = args, kwds
+        for casts in arg_casts:
+            cargs, ckwds = casts(cargs, ckwds, argc)
         if bi:
             if (base_val is eval or base_val is exec):
                 if len(cargs) < 2 and 'globals' not in ckwds:
@@ -206,10 +224,44 @@ def retic_make_function_wrapper(val, src, trg, msg, line):
                 stripped_ckwds = {k: retic_get_actual(ckwds[k]) for k in ckwds}
                 ret = val(*stripped_cargs, **stripped_ckwds)
         else: ret = val(*cargs, **ckwds)
-        return retic_mergecast(ret, src_ret, trg_ret, msg, line=line)
-    return retic_proxy(base_val, base_src, meet, trg, msg, line, call=wrapper)
+        return retic_apply_plan(ret, ret_plan)
+    prox = retic_proxy(base_val, base_src, meet, trg, msg, line, call=wrapper, steps=(arg_steps, ret_steps))
+    retic_cache_proxy(prox, orig, osrc, trg, msg, line)
+    return prox
+
+def retic_arg_casts(trg_fmls, src_fmls, msg, line):
+    # The casts one wrapper applies to the arguments of a call depend
+    # only on how many arguments are passed, and how many of them by
+    # keyword, so they are worked out once per arity and reused by every
+    # later call.
+    named = dict(src_fmls.parameters) if retic_pinstance(src_fmls, rtypes.NamedParameters) else None
+    plans = {}
+    def plan(argc, kwc):
+        plans[argc, kwc] = [retic_cast_plan([(trg, retic_merge(trg, src))], msg, line) for trg, src in \
+                                zip(trg_fmls.types(argc)[:kwc], src_fmls.types(argc)[:kwc])]
+        return plans[argc, kwc]
+    def casts(args, kwds, argc):
+        kwc = len(args)
+        ckwds = {}
+        if named is not None:
+            for k in kwds:
+                if k in named:
+                    kwc -= 1
+                    ckwds[k] = retic_cast(kwds[k], rtypes.Dyn, named[k], msg, line=line)
+                else: ckwds[k] = kwds[k]
+        else: ckwds = kwds
+        try:
+            arg_plans = plans[argc, kwc]
+        except KeyError:
+            arg_plans = plan(argc, kwc)
+        return [ retic_apply_plan(arg, casts) for arg, casts in zip(args, arg_plans) ], ckwds
+    return casts
 
 def retic_make_proxy(val, src, trg, msg, line, ext_meet=None):
+    prox = retic_cached_proxy(val, src, trg, msg, line)
+    if prox is not None:
+        return prox
+    orig, osrc = val, src
     val, src, meet = retic_check_threesome(val, src, trg, msg, line)
 #    threesome = retic_create_threesome(val, src, trg, msg, line)
     if isinstance(val, type):
@@ -220,58 +272,135 @@ def retic_make_proxy(val, src, trg, msg, line, ext_meet=None):
             return prox
     else:
         construct = None
-    return retic_proxy(val, src, meet, trg, msg, line, call=construct)
-    
+    prox = retic_proxy(val, src, meet, trg, msg, line, call=construct)
+    retic_cache_proxy(prox, orig, osrc, trg, msg, line)
+    return prox
+
+# Proxies are weakly cached by the identity of the underlying value they
+# were made for, and the site that cast it, so that casting a value
+# again while its earlier proxy is still alive returns that same
+# proxy. A live proxy keeps its value alive, so the value's id can't have
+# been reused.
+retic_proxy_cache = {}
+
+def retic_proxied(val):
+    if retic_is_proxy(val) and hasattr(val, '__actual__'):
+        return val.__actual__, val.__threesome__
+    else: return val, None
+
+def retic_cached_proxy(val, src, trg, msg, line):
+    actual, threesome = retic_proxied(val)
+    try:
+        ref, cthreesome, csrc, ctrg = retic_proxy_cache[id(actual), msg, line]
+    except KeyError:
+        return None
+    prox = ref()
+    if prox is not None and csrc == src and ctrg == trg and cthreesome == threesome:
+        return prox
+
+def retic_cache_proxy(prox, val, src, trg, msg, line):
+    actual, threesome = retic_proxied(val)
+    key = id(actual), msg, line
+    def forget(ref):
+        if retic_proxy_cache.get(key, (None,))[0] is ref:
+            del retic_proxy_cache[key]
+    try:
+        retic_proxy_cache[key] = weakref.ref(prox, forget), threesome, src, trg
+    except TypeError:
+        pass
+
+def retic_structured(ty):
+    return any(retic_tyinstance(ty, kind) for kind in [rtypes.Function, typing.Object, typing.Class,
+                                                       typing.Tuple, typing.List, typing.Dict, typing.Set])
+
+def retic_converter(src, trg, msg, line):
+    # A function performing retic_cast(val, src, trg, msg, line), with
+    # the dispatch on src and trg done once, ahead of time. None if the
+    # cast is the identity.
+    if src == trg:
+        return None
+    elif retic_tyinstance(trg, rtypes.Dyn) and not retic_structured(src):
+        return None
+    elif retic_tyinstance(src, rtypes.Dyn) and not retic_structured(trg):
+        def check(val):
+            retic_assert(retic_has_type(val, trg), val, msg)
+            return val
+        return check
+    else: return lambda val: retic_cast(val, src, trg, msg, line=line)
+
+def retic_cast_plan(casts, msg, line):
+    return tuple(conv for conv in (retic_converter(src, trg, msg, line) for src, trg in casts) if conv)
+
+def retic_apply_plan(val, plan):
+    for conv in plan:
+        val = conv(val)
+    return val
+
 def retic_mergecast(val, src, trg, msg, line):
     return retic_cast(val, src, retic_merge(src, trg), msg, line)
 
-def retic_make_getattr(obj, src, meet, trg, msg, line, function=None):
-    def n_getattr(prox, attr):
-        if attr == '__threesome__':
-            return src, meet, trg
-        elif attr == '__actual__':
-            return obj
-        elif attr == '__getstate__':
-            if hasattr(obj, '__getstate__'):
-                return obj.__getstate__
-            else: return lambda: obj
-        elif attr == '__new__':
-            return function
-        elif function:
-            if attr == '__call__':
-                return function.__get__(prox)
-        val = getattr(obj, attr)
-        if inspect.ismethod(val) and val.__self__ is obj:
-            val = val.__func__.__get__(prox)
-        elif attr != '__get__' and hasattr(val, '__self__'):
-            val = retic_make_function_wrapper(val, rtypes.Dyn, rtypes.Dyn, msg, line)
-        lsrc = src.member_type(attr, rtypes.Dyn)
-        lmeet = meet.member_type(attr, rtypes.Dyn)
-        ltrg = trg.member_type(attr, rtypes.Dyn)
-        return retic_mergecast(retic_mergecast(val, lsrc, lmeet, msg, line=line), lmeet, ltrg, msg, line=line)
-    return n_getattr
+def retic_proxy_getattr(prox, attr):
+    if attr == '__threesome__':
+        return retic_proxy_state(prox, '__threesome__')
+    obj = retic_proxy_state(prox, '__actual__')
+    function = retic_proxy_state(prox, '__retic_call__')
+    if attr == '__actual__':
+        return obj
+    elif attr == '__getstate__':
+        if hasattr(obj, '__getstate__'):
+            return obj.__getstate__
+        else: return lambda: obj
+    elif attr == '__new__':
+        return function
+    elif function:
+        if attr == '__call__':
+            return function.__get__(prox)
+    val = getattr(obj, attr)
+    if inspect.ismethod(val) and val.__self__ is obj:
+        val = val.__func__.__get__(prox)
+    elif attr != '__get__' and hasattr(val, '__self__'):
+        val = retic_make_function_wrapper(val, rtypes.Dyn, rtypes.Dyn, retic_proxy_state(prox, '__retic_message__'),
+                                          retic_proxy_state(prox, '__retic_line__'))
+    return retic_apply_plan(val, retic_member_plans(prox, attr)[0])
+
+def retic_proxy_setattr(prox, attr, val):
+    obj = retic_proxy_state(prox, '__actual__')
+    setattr(obj, attr, retic_apply_plan(val, retic_member_plans(prox, attr)[1]))
 
-def retic_make_setattr(obj, src, meet, trg, msg, line):
-    def n_setattr(prox, attr, val):
+def retic_proxy_delattr(prox, attr):
+    obj = retic_proxy_state(prox, '__actual__')
+    lmeet = retic_member_plans(prox, attr)[2]
+    if retic_tyinstance(lmeet, rtypes.Dyn):
+        delattr(obj, attr)
+    else: retic_error('%s at line %s' % (retic_proxy_state(prox, '__retic_message__'), 
+                                         retic_proxy_state(prox, '__retic_line__')))
+
+def retic_member_plans(prox, attr):
+    # The casts for reading and writing each member of a proxy, and the
+    # member's meet type, worked out on first use
+    members = retic_proxy_state(prox, '__retic_members__')
+    try:
+        return members[attr]
+    except KeyError:
+        src, meet, trg = retic_proxy_state(prox, '__threesome__')
+        msg = retic_proxy_state(prox, '__retic_message__')
+        line = retic_proxy_state(prox, '__retic_line__')
         lsrc = src.member_type(attr, rtypes.Dyn)
         lmeet = meet.member_type(attr, rtypes.Dyn)
         ltrg = trg.member_type(attr, rtypes.Dyn)
-        setattr(obj, attr, retic_mergecast(retic_mergecast(val, ltrg, lmeet, msg, line),
-                                           lmeet, lsrc, msg, line))
-    return n_setattr
+        reads = retic_cast_plan([(lsrc, retic_merge(lsrc, lmeet)), (lmeet, retic_merge(lmeet, ltrg))], msg, line)
+        writes = retic_cast_plan([(ltrg, retic_merge(ltrg, lmeet)), (lmeet, retic_merge(lmeet, lsrc))], msg, line)
+        members[attr] = reads, writes, lmeet
+        return members[attr]
 
-def retic_make_delattr(obj, src, meet, trg, msg, line):
-    def n_delattr(prox, attr):
-        lmeet = meet.member_type(attr, rtypes.Dyn)
-        if retic_tyinstance(lmeet, rtypes.Dyn):
-            delattr(obj, attr)
-        else: retic_error('%s at line %s' % (msg, line))
-    return n_delattr
+retic_proxy_hooks = retic_proxy_getattr, retic_proxy_setattr, retic_proxy_delattr
+retic_proxy_slots = ('__actual__', '__threesome__', '__retic_message__', '__retic_line__',
+                     '__retic_steps__', '__retic_call__', '__retic_members__')
         
 def retic_dynfunc(ty):
     return rtypes.Function(rtypes.DynParameters, rtypes.Dyn)
 
-def retic_check(val, trg, msg):
+def retic_check(val, trg, msg, line=None):
     return val
 
 def retic_error(msg):
@@ -4,7 +4,7 @@ from . import typing, utils, exc, flags, logging
 from os.path import join as _path_join, isdir as _path_isdir, isfile as _path_isfile
 from .rtypes import *
 from .typing import Var, StarImport
-from .gatherers import WrongContextVisitor
+from .gatherers import WrongContextVisitor, Referencefinder
 
 if flags.PY_VERSION == 3:
     from .exec3 import _exec
@@ -23,6 +23,10 @@ else:
 import_cache = {}
 not_found = set()
 
+# In closed-world mode, the identifiers used by each module of the
+# program, by absolute filename; None when the program is open
+program_references = None
+
 def _case_ok(directory, check):
     return check in os.listdir(directory if directory else flags.PATH)
 
@@ -202,3 +206,63 @@ class ImportFinder(DictGatheringVisitor):
                 env[TypeVariable(name)] = impenv[TypeVariable(member)]
         return env
 
+
+
+# Parse every module of the program reachable from its entry point
+# through imports that Reticulated would typecheck, and record the
+# identifiers each of them uses
+def close_world(py_ast, filename):
+    global program_references
+    program_references = {}
+    pending = [(os.path.abspath(filename), py_ast)]
+    while pending:
+        filename, py_ast = pending.pop()
+        if filename in program_references:
+            continue
+        program_references[filename] = Referencefinder().preorder(py_ast)
+        for path in imported_files(py_ast, os.path.dirname(filename)):
+            if path not in program_references:
+                try:
+                    with open(path) as module:
+                        pending.append((path, ast.parse(module.read())))
+                except (IOError, SyntaxError):
+                    continue
+
+def imported_files(py_ast, directory):
+    def module_files(bases, name):
+        files = []
+        for base in bases:
+            parts = name.split('.') if name else []
+            for i in range(len(parts) + 1):
+                files.append(_path_join(base, *(parts[:i] + ['__init__.py'])))
+            if parts:
+                files.append(_path_join(base, *parts) + '.py')
+        return files
+    roots = [p for p in sys.path if p.startswith(flags.PATH) or flags.TYPECHECK_LIBRARY]
+    files = []
+    for n in ast.walk(py_ast):
+        if isinstance(n, ast.Import):
+            for alias in n.names:
+                files += module_files(roots, alias.name)
+        elif isinstance(n, ast.ImportFrom):
+            if n.level:
+                base = directory
+                for _ in range(n.level - 1):
+                    base = os.path.dirname(base)
+                bases = [base]
+            else: bases = roots
+            files += module_files(bases, n.module)
+            for alias in n.names:
+                files += module_files(bases, '%s.%s' % (n.module, alias.name) if n.module else alias.name)
+    return [os.path.abspath(f) for f in files if _path_isfile(f)]
+
+# Whether any module of a closed program other than the given one
+# might refer to the name; always true when the program is open
+def referenced_elsewhere(filename, name):
+    if program_references is None or filename is None:
+        return True
+    filename = os.path.abspath(filename)
+    if filename not in program_references:
+        return True
+    return any(name in refs or '*' in refs for path, refs in program_references.items()
+               if path != filename)
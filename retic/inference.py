@@ -1,7 +1,8 @@
 from . import flags, utils, rtypes
 from .relations import *
 from .visitors import GatheringVisitor
-from .typing import Var, StarImport
+from .typing import Var, StarImport, Misc
+from .exc import StaticTypeError
 
 class InferVisitor(GatheringVisitor):
     examine_functions = False
@@ -86,3 +87,37 @@ class InferVisitor(GatheringVisitor):
             impenv = env[StarImport(n.module)]
             return [(ast.Name(id=t.var, ctx=ast.Store()), impenv[t]) for t in impenv if isinstance(t, Var)]
         return [(ast.Name(id=t.asname if t.asname is not None else t.name, ctx=ast.Store()), env[Var(t.asname if t.asname is not None else t.name)]) for t in n.names]
+
+# Return types for the unannotated top-level functions of a module,
+# found by typechecking their bodies until the types of their returns
+# stop changing; recursive calls start out returning InferBottom. Only
+# functions that nothing can rebind, and whose callers can therefore
+# rely on their returns being cast (see typecheck.function_summaries),
+# are inferred
+def infer_returns(typechecker, n, env, misc):
+    from .typecheck import function_summaries
+    summaries = function_summaries(n, env, misc.filename)
+    defs = [stmt for stmt in n.body if isinstance(stmt, ast.FunctionDef) and \
+                stmt.name in summaries and summaries[stmt.name].checks_return and \
+                getattr(stmt, 'returns', None) is None and tyinstance(env[Var(stmt.name)].to, Dyn)]
+    guesses = {fdef.name: InferBottom for fdef in defs}
+    for _ in range(flags.INFER_RETURNS_ROUNDS):
+        trial = env.copy()
+        trial.update({Var(name): Function(env[Var(name)].froms, guesses[name]) for name in guesses})
+        return_types = {name: [] for name in guesses}
+        verbosity = flags.WARNINGS
+        flags.WARNINGS = -1
+        try:
+            for fdef in defs:
+                typechecker.preorder(fdef, trial, Misc(return_types=return_types, extend=misc))
+        except StaticTypeError:
+            return {}
+        finally:
+            flags.WARNINGS = verbosity
+        inferred = {name: tyjoin(return_types[name]).lift() for name in guesses}
+        if inferred == guesses:
+            break
+        guesses = inferred
+    else: return {}
+    return {Var(name): Function(env[Var(name)].froms, guesses[name]) for name in guesses \
+                if not tyinstance(guesses[name], Dyn) and not tyinstance(guesses[name], InferBottom)}
@@ -1,7 +1,7 @@
 from .runtime import has_type as retic_has_type
 from .relations import tyinstance as retic_tyinstance
 from . import rtypes, relations, flags
-import inspect, weakref
+import weakref
 from .exc import RuntimeTypeError
 from .rtypes import pinstance
 from threading import Thread
@@ -1,7 +1,23 @@
 from .relations import info_join
-from . import rtypes
+from . import rtypes, flags
+import itertools, operator, weakref
 
 class MonoList(list):
+    # Strengthening the element type of a list with elements of a
+    # primitive type is checked at once, in a single pass in C. Otherwise
+    # the elements are re-cast lazily: each on its first read after the
+    # strengthening, plus a bounded batch of the rest on every read, so
+    # the work is spread out. __pending__ is None, or the element type
+    # before the strengthening, the error and line of the cast, a
+    # bytearray marking the elements that have been re-cast, and the
+    # index up to which all of them have. Only lists that typed code
+    # alone can reach are left pending: once a list is cast to a less
+    # precise type it may be handed to code that reads its storage
+    # directly (C code, or list's own methods), so it's brought up to
+    # date then, and strengthened eagerly from then on.
+    __pending__ = None
+    __escaped__ = False
+
     def __init__(self, *x, castfunc, error=None, line=None, type=rtypes.Dyn):
         super().__init__(*x)
         assert error is not None
@@ -12,30 +28,435 @@ class MonoList(list):
         self.__fastgetitem__ = super().__getitem__
         self.__monotonic__ = type
         self.__castfunc__ = castfunc
+        specialize(self)
     
     def __setitem__(self, k, v):
-        v = self.__castfunc__(v, rtypes.Dyn, self.__monotonic__, self.__error__, line=self.__line__)
-        super().__setitem__(k, v)
+        self.__setitem_attype__(k, v, rtypes.Dyn)
         
     def __setitem_attype__(self, k, v, t):
-        v = self.__castfunc__(v, t, self.__monotonic__, self.__error__, line=self.__line__)
+        if isinstance(k, slice):
+            # The elements of a slice written in have type t, if any
+            v = [self.__castfunc__(e, t, self.__monotonic__, self.__error__, line=self.__line__) for e in v]
+        else: v = self.__castfunc__(v, t, self.__monotonic__, self.__error__, line=self.__line__)
+        self.__recheck__(k, write=True)
         super().__setitem__(k, v)
 
     def __getitem__(self, k):
+        self.__recheck__(k)
         v = super().__getitem__(k)
         return self.__castfunc__(v, self.__monotonic__, rtypes.Dyn, self.__error__, line=self.__line__)
         
     def __getitem_attype__(self, k, t):
+        self.__recheck__(k)
         v = super().__getitem__(k)
         return self.__castfunc__(v, self.__monotonic__, t, self.__error__, line=self.__line__)
 
     def __monotonic_cast__(self, ty, error, line):
         newmono = info_join(ty, self.__monotonic__)
         if newmono != self.__monotonic__:
-            for i in range(len(self)):
-                v = self.__castfunc__(self.__fastgetitem__(i), self.__monotonic__, newmono, error, line=line)
-                self.__fastsetitem__(i, v)
+            self.__flush__()
+            pyclasses = primitive_classes(newmono)
+            if pyclasses is None and not self.__escaped__:
+                if len(self):
+                    self.__pending__ = [self.__monotonic__, error, line, bytearray(len(self)), 0]
+            elif pyclasses is None or not all(map(isinstance, list.__iter__(self), itertools.repeat(pyclasses))):
+                for i in range(len(self)):
+                    v = self.__castfunc__(self.__fastgetitem__(i), self.__monotonic__, newmono, error, line=line)
+                    self.__fastsetitem__(i, v)
             self.__monotonic__ = newmono
             self.__line__ = line
             self.__error__ = error
+            specialize(self)
+        elif ty != newmono:
+            self.__escaped__ = True
+            self.__flush__()
+
+    def __recast__(self, i):
+        oldmono, error, line, checked, _ = self.__pending__
+        if not checked[i]:
+            v = self.__castfunc__(self.__fastgetitem__(i), oldmono, self.__monotonic__, error, line=line)
+            self.__fastsetitem__(i, v)
+            checked[i] = 1
+
+    def __recheck__(self, k, write=False):
+        pending = self.__pending__
+        if pending is None:
+            return
+        if not isinstance(k, int):
+            return self.__flush__()
+        checked = pending[3]
+        i = k + len(self) if k < 0 else k
+        if 0 <= i < len(self):
+            if write:
+                checked[i] = 1
+            else: self.__recast__(i)
+        hwm = pending[4]
+        for j in range(hwm, min(hwm + RECHECK_BATCH, len(self))):
+            self.__recast__(j)
+        pending[4] = hwm = min(hwm + RECHECK_BATCH, len(self))
+        if hwm == len(self):
+            self.__pending__ = None
+
+    def __flush__(self):
+        if self.__pending__ is not None:
+            for i in range(self.__pending__[4], len(self)):
+                self.__recast__(i)
+            self.__pending__ = None
+
+RECHECK_BATCH = 16
+
+# Any other way of reaching the elements, or of moving them around,
+# finishes re-casting first
+def flushing(name):
+    meth = getattr(list, name)
+    def flushed(self, *args, **kwds):
+        if self.__pending__ is not None:
+            self.__flush__()
+        return meth(self, *args, **kwds)
+    flushed.__name__ = name
+    return flushed
+
+flushed_methods = ['__iter__', '__reversed__', '__contains__', '__repr__', '__eq__', '__ne__', '__lt__',
+                   '__le__', '__gt__', '__ge__', '__add__', '__iadd__', '__mul__', '__rmul__', '__imul__',
+                   '__delitem__', 'append', 'extend', 'insert', 'pop', 'remove', 'clear',
+                   'copy', 'index', 'count', 'sort', 'reverse']
+for name in flushed_methods:
+    setattr(MonoList, name, flushing(name))
+
+def monolist_radd(self, other):
+    if isinstance(other, list):
+        return other + list(self)
+    return NotImplemented
+MonoList.__radd__ = monolist_radd
+
+# Monotonic values pickle as the plain values they hold: their types
+# and cast functions belong to this run
+def monolist_reduce(self):
+    return list, (list(self),)
+MonoList.__reduce__ = monolist_reduce
+
+# Once a list's element type is a primitive it can't become any more
+# precise, and every element is known to have it: reads need no check,
+# and writes only an isinstance test against the Python classes that
+# have the type.
+class PrimitiveMonoList(MonoList):
+    def __setitem__(self, k, v):
+        if not isinstance(v, self.__pyclasses__):
+            return self.__setitem_attype__(k, v, rtypes.Dyn)
+        self.__fastsetitem__(k, v)
+
+    def __setitem_attype__(self, k, v, t):
+        if isinstance(k, slice):
+            pyclasses = self.__pyclasses__
+            v = [e if isinstance(e, pyclasses) else
+                 self.__castfunc__(e, t, self.__monotonic__, self.__error__, line=self.__line__) for e in v]
+        elif not isinstance(v, self.__pyclasses__):
+            v = self.__castfunc__(v, t, self.__monotonic__, self.__error__, line=self.__line__)
+        self.__fastsetitem__(k, v)
+
+    def __getitem__(self, k):
+        return self.__fastgetitem__(k)
+
+    def __getitem_attype__(self, k, t):
+        v = self.__fastgetitem__(k)
+        if t is rtypes.Dyn or t == self.__monotonic__:
+            return v
+        return self.__castfunc__(v, self.__monotonic__, t, self.__error__, line=self.__line__)
+
+# Lists of primitives are never left pending
+for name in flushed_methods:
+    setattr(PrimitiveMonoList, name, getattr(list, name))
+
+class IntMonoList(PrimitiveMonoList): pass
+class FloatMonoList(PrimitiveMonoList): pass
+class BoolMonoList(PrimitiveMonoList): pass
+class StringMonoList(PrimitiveMonoList): pass
+
+def primitive_classes(ty):
+    if ty == rtypes.Int:
+        return (int,)
+    elif ty == rtypes.Float:
+        return (float,) if flags.FLAT_PRIMITIVES else (float, int)
+    elif ty == rtypes.Bool:
+        return (bool,)
+    elif ty == rtypes.String:
+        return (str,)
+
+def specialize(lst):
+    ty = lst.__monotonic__
+    if ty == rtypes.Int:
+        lst.__class__ = IntMonoList
+    elif ty == rtypes.Float:
+        lst.__class__ = FloatMonoList
+    elif ty == rtypes.Bool:
+        lst.__class__ = BoolMonoList
+    elif ty == rtypes.String:
+        lst.__class__ = StringMonoList
+    else: return
+    lst.__pyclasses__ = primitive_classes(ty)
+
+
+
+class MonoDict(dict):
+    # Keys and values have separate types. Where either is Dyn or a
+    # primitive, its checks are just isinstance tests (an empty tuple of
+    # classes, for the other types, always fails the test and falls
+    # back to a cast), and values are read without a cast. A cast of a
+    # key may return a different object, so strengthening the key type
+    # re-inserts any key for which it does.
+    def __init__(self, *x, castfunc, error=None, line=None, keys=rtypes.Dyn, values=rtypes.Dyn):
+        super().__init__(*x)
+        assert error is not None
+        assert line is not None
+        self.__error__ = error
+        self.__line__ = line
+        self.__fastsetitem__ = super().__setitem__
+        self.__fastgetitem__ = super().__getitem__
+        self.__castfunc__ = castfunc
+        self.__retype__(keys, values)
+
+    def __retype__(self, keys, values):
+        self.__monotonic__ = rtypes.Dict(keys, values)
+        self.__pykeys__ = unchecked_classes(keys)
+        self.__pyvalues__ = unchecked_classes(values)
+        self.__rawvalues__ = bool(self.__pyvalues__)
+
+    def __setitem__(self, k, v):
+        self.__setitem_attype__(k, v, rtypes.Dyn)
+
+    def __setitem_attype__(self, k, v, t):
+        if not isinstance(k, self.__pykeys__):
+            k = self.__castfunc__(k, rtypes.Dyn, self.__monotonic__.keys, self.__error__, line=self.__line__)
+        if not isinstance(v, self.__pyvalues__):
+            v = self.__castfunc__(v, t, self.__monotonic__.values, self.__error__, line=self.__line__)
+        self.__fastsetitem__(k, v)
+
+    def __getitem__(self, k):
+        v = self.__fastgetitem__(k)
+        if self.__rawvalues__:
+            return v
+        return self.__castfunc__(v, self.__monotonic__.values, rtypes.Dyn, self.__error__, line=self.__line__)
+
+    def __getitem_attype__(self, k, t):
+        v = self.__fastgetitem__(k)
+        if t is rtypes.Dyn and self.__rawvalues__ or t == self.__monotonic__.values:
+            return v
+        return self.__castfunc__(v, self.__monotonic__.values, t, self.__error__, line=self.__line__)
+
+    def __reduce__(self):
+        return dict, (dict(dict.items(self)),)
+
+    def setdefault(self, k, default=None):
+        if k not in self:
+            self[k] = default
+        return self.__fastgetitem__(k)
+
+    def update(self, *other, **kwds):
+        for k, v in dict(*other, **kwds).items():
+            self[k] = v
+
+    def __monotonic_cast__(self, keys, values, error, line):
+        oldkeys, oldvalues = self.__monotonic__.keys, self.__monotonic__.values
+        newkeys = info_join(keys, oldkeys)
+        newvalues = info_join(values, oldvalues)
+        # If the types conflict, the contents are checked from scratch,
+        # which reports the error
+        if not newkeys.top_free():
+            oldkeys, newkeys = rtypes.Dyn, keys
+        if not newvalues.top_free():
+            oldvalues, newvalues = rtypes.Dyn, values
+        if newkeys == oldkeys and newvalues == oldvalues:
+            return
+        if newvalues != oldvalues:
+            pyclasses = primitive_classes(newvalues)
+            if pyclasses is None or not all(map(isinstance, dict.values(self), itertools.repeat(pyclasses))):
+                for k, v in list(dict.items(self)):
+                    self.__fastsetitem__(k, self.__castfunc__(v, oldvalues, newvalues, error, line=line))
+        if newkeys != oldkeys:
+            pyclasses = primitive_classes(newkeys)
+            if pyclasses is None or not all(map(isinstance, dict.__iter__(self), itertools.repeat(pyclasses))):
+                for k in list(dict.__iter__(self)):
+                    nk = self.__castfunc__(k, oldkeys, newkeys, error, line=line)
+                    if nk is not k:
+                        self.__fastsetitem__(nk, dict.pop(self, k))
+        self.__retype__(newkeys, newvalues)
+        self.__line__ = line
+        self.__error__ = error
+
+class MonoSet(set):
+    # As with the keys of a MonoDict, casting an element may return a
+    # different object, which then replaces the original.
+    def __init__(self, *x, castfunc, error=None, line=None, type=rtypes.Dyn):
+        super().__init__(*x)
+        assert error is not None
+        assert line is not None
+        self.__error__ = error
+        self.__line__ = line
+        self.__fastadd__ = super().add
+        self.__castfunc__ = castfunc
+        self.__retype__(type)
+
+    def __retype__(self, type):
+        self.__monotonic__ = type
+        self.__pyclasses__ = unchecked_classes(type)
+
+    def add(self, v):
+        self.__add_attype__(v, rtypes.Dyn)
+
+    def __add_attype__(self, v, t):
+        if not isinstance(v, self.__pyclasses__):
+            v = self.__castfunc__(v, t, self.__monotonic__, self.__error__, line=self.__line__)
+        self.__fastadd__(v)
+
+    def __reduce__(self):
+        return set, (list(set.__iter__(self)),)
+
+    def update(self, *others):
+        for other in others:
+            for v in other:
+                self.add(v)
+
+    def symmetric_difference_update(self, other):
+        for v in set(other):
+            if v in self:
+                self.remove(v)
+            else: self.add(v)
+
+    def __ior__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        self.update(other)
+        return self
+
+    def __ixor__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        self.symmetric_difference_update(other)
+        return self
+
+    def __monotonic_cast__(self, ty, error, line):
+        oldmono, newmono = self.__monotonic__, info_join(ty, self.__monotonic__)
+        if not newmono.top_free():
+            oldmono, newmono = rtypes.Dyn, ty
+        if newmono != self.__monotonic__:
+            pyclasses = primitive_classes(newmono)
+            if pyclasses is None or not all(map(isinstance, set.__iter__(self), itertools.repeat(pyclasses))):
+                for v in list(set.__iter__(self)):
+                    nv = self.__castfunc__(v, oldmono, newmono, error, line=line)
+                    if nv is not v:
+                        set.remove(self, v)
+                        self.__fastadd__(nv)
+            self.__retype__(newmono)
+            self.__line__ = line
+            self.__error__ = error
+
+# Tuples can't be written, so they're checked once, when a cast makes
+# them, and remember the type they were checked at: a later cast to a
+# type no more precise than that costs nothing.
+class MonoTuple(tuple):
+    def __reduce__(self):
+        return tuple, (tuple(self),)
+
+def check_tuple(tup, *, castfunc, error, line, src, trg):
+    if isinstance(tup, MonoTuple):
+        src = tup.__monotonic__
+    srcs = itertools.repeat(rtypes.Dyn)
+    if rtypes.tyinstance(src, rtypes.Tuple) and len(src.elements) == len(trg.elements):
+        join = info_join(trg, src)
+        # If the types conflict, the elements are checked from scratch,
+        # which reports the error
+        if join.top_free():
+            if isinstance(tup, MonoTuple) and join == src:
+                return tup
+            srcs, trg = src.elements, join
+    elts = [castfunc(v, s, t, error, line=line) for v, s, t in zip(tup, srcs, trg.elements)]
+    # A list checked as a tuple may be shared, so it's only returned if
+    # it's unchanged
+    if isinstance(tup, list) and all(map(operator.is_, elts, tup)):
+        return tup
+    mono = MonoTuple(elts)
+    mono.__monotonic__ = trg
+    return mono
+
+def unchecked_classes(ty):
+    if ty == rtypes.Dyn:
+        return (object,)
+    pyclasses = primitive_classes(ty)
+    return pyclasses if pyclasses is not None else ()
+
+# The monotonic types of an object's attributes. Objects whose
+# attributes have the same types share a single map, which is never
+# modified: strengthening an object's types moves it to another map,
+# and the map reached from each one by a cast at each site is kept, so
+# that it's found again without recomputing it, and so that a cast
+# which adds nothing can be seen to lead back to the same map.
+class TypeMap(dict):
+    __slots__ = ('transitions',)
+
+    def __init__(self, *x):
+        super().__init__(*x)
+        self.transitions = {}
+
+EMPTY_TYPEMAP = TypeMap()
+
+# A plain list, dict or set can't be made monotonic in place, since
+# its class can't be changed, so casting one copies it into a MonoList,
+# MonoDict or MonoSet, which checks every write made to it from then
+# on; writes through other references to the original go to the
+# original, and are never seen through the copy. Each copy is
+# remembered, weakly, by the identity of the original and the type it
+# was cast to, and reused when the same value is cast to the same type
+# again while it still holds exactly the same elements; otherwise a
+# fresh copy is made. A copy keeps its original alive, so the
+# original's identity can't be reused while the copy can still be
+# found.
+upgraded = {}
+
+def cached_copy(val, cls, same, target, **kwds):
+    key = id(val)
+    for ctarget, ref in upgraded.get(key, ()):
+        mono = ref()
+        if mono is not None and ctarget == target and isinstance(mono, cls) and \
+                len(val) == len(mono) and same(val, mono):
+            return mono
+    mono = cls(val, **kwds)
+    mono.__original__ = val
+    def forget(ref):
+        entries = upgraded.get(key, [])
+        entries[:] = [entry for entry in entries if entry[1] is not ref]
+        if not entries:
+            upgraded.pop(key, None)
+    upgraded.setdefault(key, []).append((target, weakref.ref(mono, forget)))
+    return mono
+
+def same_list(orig, mono):
+    return all(map(operator.is_, orig, list.__iter__(mono)))
+
+def same_dict(orig, mono):
+    return all(k in mono and dict.__getitem__(mono, k) is v for k, v in orig.items())
+
+def same_set(orig, mono):
+    return all(map(set.__contains__, itertools.repeat(mono), orig))
+
+def upgrade(lst, *, castfunc, error, line, type, target):
+    return cached_copy(lst, MonoList, same_list, target, castfunc=castfunc, error=error, line=line, type=type)
+
+def upgrade_dict(dct, *, castfunc, error, line, keys, values, target):
+    return cached_copy(dct, MonoDict, same_dict, target, castfunc=castfunc, error=error, line=line,
+                       keys=keys, values=values)
+
+def upgrade_set(st, *, castfunc, error, line, type, target):
+    return cached_copy(st, MonoSet, same_set, target, castfunc=castfunc, error=error, line=line, type=type)
 
+# Frozensets can't be written, so like tuples they're checked, and
+# only rebuilt if a cast changed an element.
+def check_frozenset(st, *, castfunc, error, line, type, trg):
+    if type == trg.type:
+        return st
+    pyclasses = primitive_classes(trg.type)
+    if pyclasses is not None and all(map(isinstance, st, itertools.repeat(pyclasses))):
+        return st
+    elts = [(v, castfunc(v, type, trg.type, error, line=line)) for v in st]
+    if all(v is nv for v, nv in elts):
+        return st
+    return frozenset(nv for _, nv in elts)
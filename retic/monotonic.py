@@ -2,9 +2,10 @@ from .runtime import has_type as retic_has_type, tyinstance as retic_tyinstance,
 from .logging import warn as retic_warn 
 from .relations import n_info_join, info_join, merge as retic_merge, subcompat as retic_subcompat 
 from .exc import UnimplementedException as ReticUnimplementedException, RuntimeTypeError
-import inspect
+import inspect, weakref
 from . import typing, guarded, rtypes, mono_datastructures
-from .rproxy import create_proxy as retic_create_proxy
+from .rproxy import create_proxy as retic_create_proxy, instantiate as retic_instantiate_proxy, \
+    get_state as retic_proxy_state
 
 class InternalTypeError(Exception):
     pass
@@ -23,19 +24,33 @@ def retic_assert(bool, val, msg, exc=None):
         raise exc(msg % val)
 
 def retic_strengthen_monotonics(value, new, msg, line):
-    new = new.copy()
-    if '__monotonics__' not in value.__dict__:
-        value.__monotonics__ = new
-    else:
+    old = value.__dict__.get('__monotonics__', mono_datastructures.EMPTY_TYPEMAP)
+    site = msg, line
+    try:
+        monotonics = old.transitions[site]
+    except KeyError:
+        monotonics = dict(old)
         for attr in new:
-            if attr in value.__monotonics__:
-                join = info_join(new[attr], value.__monotonics__[attr])
+            if attr in old:
+                if new[attr] == old[attr]:
+                    continue
+                join = info_join(new[attr], old[attr])
                 if join.top_free():
-                    value.__monotonics__[attr] = join
+                    monotonics[attr] = join
                 else:
-                    retic_assert(False, val, msg)
+                    retic_assert(False, value, msg)
             else:
-                value.__monotonics__[attr] = new[attr]
+                monotonics[attr] = new[attr]
+        for shared in [old] + list(old.transitions.values()):
+            if shared == monotonics:
+                monotonics = shared
+                break
+        else:
+            monotonics = mono_datastructures.TypeMap(monotonics)
+            monotonics.transitions[site] = monotonics
+        old.transitions[site] = monotonics
+    if monotonics is not old:
+        value.__monotonics__ = monotonics
 
 def retic_can_set(value, mem):
     try:
@@ -44,70 +59,108 @@ def retic_can_set(value, mem):
     except:
         return False
 
+# Which members of a value are methods, and whether the rest are
+# defined somewhere in its class hierarchy, depends only on its class
+# (or on the value itself, if it's a class) except where the value's
+# own __dict__ shadows them, so it's worked out once per class and cast
+# site, along with whether the value can be made monotonic at all. The
+# plans are held weakly by class, so that classes made on the fly can
+# still be collected.
+retic_monotonic_plans = weakref.WeakKeyDictionary()
+
+def retic_monotonic_plan(value, members, msg, line):
+    owner = value if isinstance(value, type) else value.__class__
+    try:
+        plans = retic_monotonic_plans[owner]
+    except KeyError:
+        plans = retic_monotonic_plans[owner] = {}
+    key = msg, line, tuple(members)
+    try:
+        return plans[key]
+    except KeyError:
+        plan = plans[key] = retic_can_be_monotonic(value, line), {}
+        return plan
+
+def retic_member_kind(value, mem, mro, line, msg):
+    attr = getattr(value, mem)
+    if inspect.ismethod(attr) or \
+       inspect.isclass(value) and inspect.isfunction(attr) or\
+       hasattr(attr, '__self__'):
+        return 'method'
+    for loc in mro:
+        if mem in loc.__dict__:
+            return 'attribute'
+    raise InternalTypeError(mem, line, msg)
+
 def retic_monotonic_cast(value, src, trg, members, msg, line):
-    if not retic_can_be_monotonic(value, line):
+    can, kinds = retic_monotonic_plan(value, members, msg, line)
+    if not can:
         #return retic_make_proxy(value, src, trg, msg, line)
         return value
-    monos = {}
-    updates = {}
+    monotonics = value.__dict__.get('__monotonics__', mono_datastructures.EMPTY_TYPEMAP)
+    if monotonics.transitions.get((msg, line)) is monotonics:
+        # This site already cast the value to these types
+        return value
+    own = {} if isinstance(value, type) else value.__dict__
     methods = set()
-    def update(loc, mem, dict):
-        if True: #At this point, we always put things in the value
-            loc = 'SRC'   
-        if loc in dict:
-            dict[loc][mem] = members[mem]
-        else:
-            dict[loc] = {mem : members[mem]}
-    mro = [value] + (value.mro() if hasattr(value, 'mro') else []) + type.mro(value.__class__)
     for mem in members:
-        if inspect.ismethod(getattr(value, mem)) or \
-           inspect.isclass(value) and inspect.isfunction(getattr(value, mem)) or\
-           hasattr(getattr(value, mem), '__self__'):
-            update(value, mem, monos)
-            update(value, mem, updates)
-            methods.add(mem)
-            #print('upd8', mem, value)
+        if mem in own:
+            attr = own[mem]
+            kind = 'method' if inspect.ismethod(attr) or hasattr(attr, '__self__') else 'attribute'
         else:
-            for loc in mro:
-                update(loc, mem, monos)
-                if mem in loc.__dict__:
-                    update(loc,mem,updates)
-                    #print('upd8', mem, loc, getattr(value, mem))
-                    break
-            else: #If no break occurred on internal loop
-                raise InternalTypeError(mem, line, msg)
-    for location in monos:
-        monotonics = monos[location]
-        upd = updates.get(location, [])
-
-        if location == 'SRC':
-            location = value
+            kind = kinds.get(mem)
+            if kind is None:
+                mro = (value.mro() if hasattr(value, 'mro') else []) + type.mro(value.__class__)
+                kind = kinds[mem] = retic_member_kind(value, mem, mro, line, msg)
+        if kind == 'method':
+            methods.add(mem)
 
-        for mem in upd:
-            try:
-                mem_val = getattr(location, mem)
-                if '__monotonics__' in location.__dict__ and mem in location.__monotonics__:
-                    srcty = location.__monotonics__[mem]
-                else: srcty = typing.Dyn
-                updated_type = upd[mem]
-                if mem in methods:
-                    updated_type = updated_type.unbind()
+    # Members are read and written from beneath the monotonic hooks, if
+    # the class or one of its bases has them, so that the only casts
+    # made are this site's, and blame it. They're only written back when
+    # the cast changed them, or when they're fields the value doesn't
+    # hold itself yet: those are copied into it from its class, as they
+    # would be by a write
+    installed = retic_monotonic_installed(value.__class__)
+    getter = retic_inherited_accessor(value.__class__, '__fastgetattr__', getattr)
+    setter = retic_inherited_accessor(value.__class__, '__fastsetattr__', setattr)
+    for mem in members:
+        if mem in methods and not isinstance(value, type):
+            # An instance's methods are its class's, and left to it
+            continue
+        try:
+            mem_val = getter(value, mem)
+            copy = mem not in methods and mem not in value.__dict__ and not retic_is_special(mem)
+            srcty = monotonics.get(mem, typing.Dyn)
+            updated_type = members[mem]
+            if mem in methods and not retic_tyinstance(updated_type, typing.Dyn):
+                updated_type = updated_type.unbind()
+            if srcty == updated_type or retic_tyinstance(updated_type, typing.Dyn):
+                new_mem_val = mem_val
+            else:
                 trgty = info_join(srcty, updated_type)
                 if not trgty.top_free():
-                    raise CastError('%s at line %s %s %s %s %s' % (msg, line, location, mem, srcty, updated_type))
+                    raise CastError('%s at line %s %s %s %s %s' % (msg, line, value, mem, srcty, updated_type))
                 new_mem_val = retic_cast(mem_val, srcty, trgty, msg, line=line)
-                setattr(location, mem, new_mem_val)
-            except AttributeError:
-                retic_warn('Unable to modify %s attribute of value %s at line %d' % (mem, location, line), 0)
-                continue
-        
-        if retic_can_be_monotonic(location, line):
-            if not retic_monotonic_installed(location.__class__):
-                retic_install_setter(location, line, msg)
-                retic_install_deleter(location, line, msg)
-                retic_install_getter(location, line, msg)
-            retic_strengthen_monotonics(location, monotonics, msg, line)
-        else: pass#print('Unable to monotonically specify', location)
+            if new_mem_val is not mem_val or copy:
+                setter(value, mem, new_mem_val)
+        except AttributeError:
+            retic_warn('Unable to modify %s attribute of value %s at line %d' % (mem, value, line), 0)
+            continue
+
+    if not installed:
+        # Instances start out sharing the empty map
+        if '__monotonics__' not in value.__class__.__dict__:
+            value.__class__.__monotonics__ = mono_datastructures.EMPTY_TYPEMAP
+        if isinstance(value, type):
+            retic_install_setter(value, line, msg)
+            retic_install_deleter(value, line, msg)
+            retic_install_getter(value, line, msg)
+        else: retic_install_accessors(value.__class__)
+    if not isinstance(value, type):
+        retic_install_attributes(value.__class__, {mem: members[mem] for mem in members
+                                                   if mem not in methods}, msg, line)
+    retic_strengthen_monotonics(value, members, msg, line)
     return value
 
 def retic_dyn_projection(ty):
@@ -117,6 +170,12 @@ def retic_dyn_projection(ty):
         return rtypes.Function(rtypes.DynParameters, rtypes.Dyn)
     elif retic_tyinstance(ty, rtypes.List):
         return rtypes.List(rtypes.Dyn)
+    elif retic_tyinstance(ty, rtypes.Dict):
+        return rtypes.Dict(rtypes.Dyn, rtypes.Dyn)
+    elif retic_tyinstance(ty, rtypes.Set):
+        return rtypes.Set(rtypes.Dyn)
+    elif retic_tyinstance(ty, rtypes.Tuple):
+        return rtypes.Tuple(*[rtypes.Dyn for _ in ty.elements])
     elif retic_tyinstance(ty, rtypes.Class):
         return rtypes.Class(ty.name, 
                             {k: rtypes.Dyn for k in ty.members},
@@ -136,6 +195,12 @@ def retic_inject(val, trg, msg, line):
         retic_assert(callable(val), val, msg, exc=FunctionCastTypeError)
     elif retic_tyinstance(trg, rtypes.List):
         retic_assert(isinstance(val, list), val, msg)
+    elif retic_tyinstance(trg, rtypes.Dict):
+        retic_assert(isinstance(val, dict), val, msg)
+    elif retic_tyinstance(trg, rtypes.Set):
+        retic_assert(isinstance(val, (set, frozenset)), val, msg)
+    elif retic_tyinstance(trg, rtypes.Tuple):
+        retic_assert(isinstance(val, (tuple, list)) and len(val) == len(trg.elements), val, msg)
     elif retic_tyinstance(trg, rtypes.Class) or retic_tyinstance(trg, rtypes.Object):
         retic_assert(retic_has_shape(val, trg.members), val, msg, exc=ObjectTypeAttributeCastError)
     elif retic_tyinstance(trg, rtypes.Structural):
@@ -148,8 +213,6 @@ def retic_inject(val, trg, msg, line):
 def retic_cast(val, src, trg, msg, line=None):
     if src == trg:
         return val
-    if line == None:
-        line = inspect.currentframe().f_back.f_lineno
     if retic_tyinstance(trg, rtypes.Dyn):
         trg = retic_dyn_projection(src)
         return retic_cast(val, src, trg, msg, line=line)
@@ -166,10 +229,35 @@ def retic_cast(val, src, trg, msg, line=None):
         if not isinstance(val, mono_datastructures.MonoList):
             if retic_tyinstance(src, typing.List):
                 ty = src.type
-            else: ty = Dyn
-            val = mono_datastructures.MonoList(val, error=msg, line=line, type=ty, castfunc=retic_cast)
+            else: ty = rtypes.Dyn
+            val = mono_datastructures.upgrade(val, error=msg, line=line, type=ty, target=trg,
+                                              castfunc=retic_cast)
+        val.__monotonic_cast__(trg.type, msg, line)
+        return val
+    elif retic_tyinstance(trg, typing.Dict):
+        if not isinstance(val, mono_datastructures.MonoDict):
+            if retic_tyinstance(src, typing.Dict):
+                keys, values = src.keys, src.values
+            else: keys, values = rtypes.Dyn, rtypes.Dyn
+            val = mono_datastructures.upgrade_dict(val, error=msg, line=line, keys=keys, values=values,
+                                                   target=trg, castfunc=retic_cast)
+        val.__monotonic_cast__(trg.keys, trg.values, msg, line)
+        return val
+    elif retic_tyinstance(trg, typing.Set):
+        if not isinstance(val, mono_datastructures.MonoSet):
+            if retic_tyinstance(src, typing.Set):
+                ty = src.type
+            else: ty = rtypes.Dyn
+            if isinstance(val, frozenset):
+                return mono_datastructures.check_frozenset(val, error=msg, line=line, type=ty, trg=trg,
+                                                           castfunc=retic_cast)
+            val = mono_datastructures.upgrade_set(val, error=msg, line=line, type=ty, target=trg,
+                                                  castfunc=retic_cast)
         val.__monotonic_cast__(trg.type, msg, line)
         return val
+    elif retic_tyinstance(trg, typing.Tuple):
+        retic_assert(len(val) == len(trg.elements), val, msg)
+        return mono_datastructures.check_tuple(val, error=msg, line=line, src=src, trg=trg, castfunc=retic_cast)
     elif retic_tyinstance(src, typing.Object):
         if retic_tyinstance(trg, typing.Object):
             for m in trg.members:
@@ -218,16 +306,27 @@ def retic_cast(val, src, trg, msg, line=None):
     else:
         raise ReticUnimplementedException(src, trg)
 
-def retic_check(val, trg, msg, line=inspect.currentframe().f_back.f_lineno):
+def retic_check(val, trg, msg, line=None):
     # This needs to be a NAIVE SUPERTYPE check, MAYBE?
     #assert retic_has_type(val, trg), "%s at line %d" % (msg, inspect.currentframe().f_back.f_lineno)
     return val
 
-def retic_error(msg, line=inspect.currentframe().f_back.f_lineno):
+def retic_error(msg, line=None):
     raise CastError(msg)
 
-def retic_monotonic_installed(value):
-    return '__fastsetattr__' in value.__dict__
+# Looked up beneath any monotonic hooks on the class's own metaclass
+def retic_monotonic_installed(cls):
+    return '__fastsetattr__' in type.__getattribute__(cls, '__dict__')
+
+def retic_monotonic_accessor(cls, name):
+    return type.__getattribute__(cls, '__dict__').get(name)
+
+def retic_inherited_accessor(cls, name, default):
+    for base in type.__getattribute__(cls, '__mro__'):
+        accessor = retic_monotonic_accessor(base, name)
+        if accessor is not None:
+            return accessor
+    return default
 
 def retic_can_be_monotonic(value, line):
     # Check for typical issues
@@ -246,56 +345,223 @@ def retic_can_be_monotonic(value, line):
             #retic_warn('Line %d: %s cannot be made monotonic.' % (line, value), 0)
             return False
 
+# Classes are made monotonic by hooking their metaclass's attribute
+# access, below. Instances instead get a descriptor on their class for
+# each attribute that has a monotonic type, which casts on reads and
+# writes for the instances whose map types the attribute; every other
+# attribute is found by Python's own lookup. The value stays in the
+# instance's __dict__, and whatever the class already had under that
+# name (a default, a property) is kept by the descriptor, and used as
+# before when the instance doesn't shadow it.
+retic_missing = object()
+
+# Reading an attribute that only ever has a base type needs no cast, so
+# if the class has nothing else under that name, its descriptor is not
+# a data descriptor, and Python reads the value straight from the
+# instance's __dict__; it's only consulted when the instance hasn't set
+# the attribute. (A data descriptor with no __get__ would be returned
+# itself in that case.) Writes and deletions of these fields are caught
+# by the class's __setattr__ and __delattr__ instead, see
+# retic_install_field_hooks.
+class MonotonicField(object):
+    __slots__ = ('name', 'original', 'data', 'msg', 'line')
+
+    def __init__(self, name, original, msg, line):
+        self.name = name
+        self.original = original
+        self.data = hasattr(type(original), '__set__')
+        self.msg = msg
+        self.line = line
+
+    def load(self, obj):
+        if not self.data:
+            try:
+                return obj.__dict__[self.name]
+            except KeyError:
+                pass
+        original = self.original
+        if original is retic_missing:
+            raise AttributeError(self.name)
+        elif hasattr(type(original), '__get__'):
+            return original.__get__(obj, type(obj))
+        else: return original
+
+    def store(self, obj, val):
+        if self.data:
+            self.original.__set__(obj, val)
+        else: obj.__dict__[self.name] = val
+
+    def __get__(self, obj, cls):
+        raise AttributeError(self.name)
+
+    def set(self, obj, val):
+        monotonics = obj.__monotonics__
+        if monotonics is not mono_datastructures.EMPTY_TYPEMAP and self.name in monotonics:
+            val = retic_cast(val, typing.Dyn, monotonics[self.name], self.msg, line=self.line)
+        self.store(obj, val)
+
+    def delete(self, obj):
+        if self.name in obj.__monotonics__:
+            assert False, "Attempting to delete monotonic attribute at line %d" % self.line
+        elif self.data:
+            self.original.__delete__(obj)
+        else:
+            try:
+                del obj.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name)
+
+# Any other attribute's reads, writes and deletions all go through its
+# descriptor.
+class MonotonicAttribute(MonotonicField):
+    __slots__ = ()
+    __set__ = MonotonicField.set
+    __delete__ = MonotonicField.delete
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            original = self.original
+            if original is retic_missing:
+                raise AttributeError(self.name)
+            elif hasattr(type(original), '__get__'):
+                return original.__get__(None, cls)
+            else: return original
+        value = self.load(obj)
+        monotonics = obj.__monotonics__
+        if monotonics is not mono_datastructures.EMPTY_TYPEMAP and self.name in monotonics:
+            src = monotonics[self.name]
+            # Casting a value of a base type to Dyn leaves it alone
+            if isinstance(src, rtypes.Base):
+                return value
+            if hasattr(value, '__self__'):
+                src = src.unbind()
+            return retic_cast(value, src, typing.Dyn, self.msg, line=self.line)
+        return value
+
+def retic_install_accessors(cls):
+    type.__setattr__(cls, '__monotonic_attributes__', dict(getattr(cls, '__monotonic_attributes__', {})))
+    type.__setattr__(cls, '__fastgetattr__', retic_fastgetattr)
+    type.__setattr__(cls, '__fastsetattr__', retic_fastsetattr)
+    type.__setattr__(cls, '__getattr_attype__', retic_getattr_attype)
+    type.__setattr__(cls, '__setattr_attype__', retic_setattr_attype)
+
+# Only fields get descriptors: special names are looked up on the type
+# by Python itself, bypassing the instance, and a name the class has a
+# method under is a method of every instance that doesn't shadow it.
+def retic_is_special(mem):
+    return mem.startswith('__') and mem.endswith('__')
+
+def retic_install_field_hooks(cls):
+    setter = retic_inherited_accessor(cls, '__setattr__', object.__setattr__)
+    deleter = retic_inherited_accessor(cls, '__delattr__', object.__delattr__)
+    if getattr(setter, '__retic_field_hook__', False):
+        return
+    def new_setter(obj, attr, val):
+        field = type(obj).__monotonic_attributes__.get(attr)
+        if field is not None and field.__class__ is MonotonicField:
+            field.set(obj, val)
+        else: setter(obj, attr, val)
+    def new_deleter(obj, attr):
+        field = type(obj).__monotonic_attributes__.get(attr)
+        if field is not None and field.__class__ is MonotonicField:
+            field.delete(obj)
+        else: deleter(obj, attr)
+    new_setter.__retic_field_hook__ = True
+    type.__setattr__(cls, '__setattr__', new_setter)
+    type.__setattr__(cls, '__delattr__', new_deleter)
+
+def retic_install_attributes(cls, members, msg, line):
+    attributes = cls.__dict__['__monotonic_attributes__']
+    for mem in members:
+        if retic_is_special(mem):
+            continue
+        field = isinstance(members[mem], rtypes.Base)
+        if mem not in attributes or not field and not isinstance(attributes[mem], MonotonicAttribute):
+            original = retic_missing
+            for base in cls.__mro__:
+                if mem in base.__dict__:
+                    original = base.__dict__[mem]
+                    break
+            if isinstance(original, MonotonicField):
+                original = original.original
+            elif inspect.isroutine(original) or isinstance(original, (staticmethod, classmethod)):
+                continue
+            kind = MonotonicField if field and original is retic_missing else MonotonicAttribute
+            if kind is MonotonicField:
+                retic_install_field_hooks(cls)
+            attributes[mem] = kind(mem, original, msg, line)
+            type.__setattr__(cls, mem, attributes[mem])
+
+def retic_fastgetattr(obj, attr):
+    attribute = type(obj).__monotonic_attributes__.get(attr)
+    if attribute is not None:
+        return attribute.load(obj)
+    else: return getattr(obj, attr)
+
+def retic_fastsetattr(obj, attr, val):
+    attribute = type(obj).__monotonic_attributes__.get(attr)
+    if attribute is not None:
+        attribute.store(obj, val)
+    else: setattr(obj, attr, val)
+
+def retic_getattr_attype(obj, attr, ty):
+    attribute = type(obj).__monotonic_attributes__.get(attr)
+    monotonics = obj.__monotonics__
+    if attribute is not None and attr in monotonics:
+        return retic_cast(attribute.load(obj), monotonics[attr], ty, attribute.msg, line=attribute.line)
+    else: return getattr(obj, attr)
+
+def retic_setattr_attype(obj, attr, val, ty):
+    attribute = type(obj).__monotonic_attributes__.get(attr)
+    monotonics = obj.__monotonics__
+    if attribute is not None and attr in monotonics:
+        attribute.store(obj, retic_cast(val, ty, monotonics[attr], attribute.msg, line=attribute.line))
+    else: setattr(obj, attr, val)
+
 def retic_install_getter(value, line, msg):
     getter = value.__class__.__getattribute__
     value.__class__.__fastgetattr__ = getter
-    def deep_hasattr(obj, attr): # Using hasattr in new_getter results in infinite loop
-        try: 
-            getter(obj, attr)
-            return True
-        except AttributeError:
-            return False
     def new_getter(obj, attr):
         #print('get', attr)
-        if deep_hasattr(obj, '__monotonics__') and attr in getter(obj, '__monotonics__'):
+        monotonics = getter(obj, '__monotonics__')
+        if monotonics is not mono_datastructures.EMPTY_TYPEMAP and attr in monotonics:
             #print('GETT ', attr, obj.__monotonics__[attr])
             value = getter(obj, attr)
-            src = getter(obj, '__monotonics__')[attr]
-            print ("ATTR", attr)
-            print (attr, getter(obj, '__dict__'), src)
-            print (value, hasattr(value, '__self__'))
+            src = monotonics[attr]
             if hasattr(value, '__self__'):
                 src = src.unbind()
             return retic_cast(value, src, typing.Dyn, msg, line=line)
         else: return getter(obj, attr)
     value.__class__.__getattribute__ = new_getter
     def typed_getter(obj, attr, ty):
-        if deep_hasattr(obj, '__monotonics__') and attr in getter(obj, '__monotonics__'):
-            return retic_cast(getter(obj, attr), getter(obj, '__monotonics__')[attr], ty, msg, line=line)
-        elif attr in ['__getattribute__', '__getattr_attype__', '__fastgetattr__', '__setattr__', '__setattr_attype__', '__fastsetattr__']:
-            return getter(obj, attr)
-        else: raise UnexpectedTypeError('Typed-getting an inappropriate value')
+        monotonics = getter(obj, '__monotonics__')
+        if attr in monotonics:
+            return retic_cast(getter(obj, attr), monotonics[attr], ty, msg, line=line)
+        else: return getter(obj, attr)
     value.__class__.__getattr_attype__ = typed_getter
 
 def retic_install_setter(value, line, msg):
+    getter = value.__class__.__getattribute__
     setter = value.__class__.__setattr__
     value.__class__.__fastsetattr__ = setter
     def new_setter(obj, attr, val):
-        if hasattr(obj, '__monotonics__') and attr in obj.__monotonics__:
-            val = retic_cast(val, typing.Dyn, obj.__monotonics__[attr], msg, line=line)
+        monotonics = getter(obj, '__monotonics__')
+        if monotonics is not mono_datastructures.EMPTY_TYPEMAP and attr in monotonics:
+            val = retic_cast(val, typing.Dyn, monotonics[attr], msg, line=line)
         setter(obj, attr, val)
     value.__class__.__setattr__ = new_setter
     def typed_setter(obj, attr, val, ty):
-        if hasattr(obj, '__monotonics__') and attr in obj.__monotonics__:
-            val = retic_cast(val, ty, obj.__monotonics__[attr], msg, line=line)
-            setter(obj, attr, val)
-        else: raise UnexpectedTypeError('Typed-setting an inappropriate value')
+        monotonics = getter(obj, '__monotonics__')
+        if attr in monotonics:
+            val = retic_cast(val, ty, monotonics[attr], msg, line=line)
+        setter(obj, attr, val)
     value.__class__.__setattr_attype__ = typed_setter
     
 def retic_install_deleter(value, line, msg):
+    getter = value.__class__.__getattribute__
     deleter = value.__class__.__delattr__
     def new_deleter(obj, attr):
-        if hasattr(obj, '__monotonics__') and attr in obj.__monotonics__:
+        if attr in getter(obj, '__monotonics__'):
             assert False, "Attempting to delete monotonic attribute at line %d" % line
         else: deleter(obj, attr)
     value.__class__.__delattr__ = new_deleter
@@ -304,43 +570,37 @@ def retic_install_deleter(value, line, msg):
 def retic_dynfunc(ty):
     return rtypes.Function(rtypes.DynParameters, rtypes.Dyn)
 
-def retic_proxy(val, src, join, trg, msg, line, call=None, meta=False):
-    Proxy = retic_create_proxy(val)
-
-    typegen = isinstance(val, type) and not meta
+def retic_proxy(val, src, join, trg, msg, line, call=None):
+    Proxy = retic_create_proxy(val, retic_proxy_hooks, retic_proxy_slots)
 
-    if typegen:
-        meta = retic_proxy(val, src, join, trg, msg, line, call=call,meta=True)
+    if isinstance(val, type):
         try:
-            class Proxy(val, metaclass=meta):
+            class Proxy(val, metaclass=Proxy):
+                __actual__ = val
+                __cast__ = src, join, trg, msg, line
+                __retic_call__ = call
                 def __new__(cls, *args, **kwd):
                     return call.__get__(cls)(*args, **kwd)
         except TypeError:
-            class Proxy(type, metaclass=meta):
+            class Proxy(type, metaclass=Proxy):
+                __actual__ = val
+                __cast__ = src, join, trg, msg, line
+                __retic_call__ = call
                 def __new__(cls, *args, **kwd):
                     return call.__get__(cls)(*args, **kwd)
         return Proxy
 
-    Proxy.__actual__ = val
-    Proxy.__cast__ = src, join, trg, msg, line
-    Proxy.__getattribute__ = retic_make_getattr(val, src, join, trg, msg, line, function=call)
-    Proxy.__setattr__ = retic_make_setattr(val, src, join, trg, msg, line)
-    Proxy.__delattr__ = retic_make_delattr(val, src, join, trg, msg, line)
-    if not meta:
-        return Proxy()
-    else:
-        return Proxy
+    return retic_instantiate_proxy(Proxy, val, __actual__=val, __cast__=(src, join, trg, msg, line),
+                                   __retic_call__=call)
 
 def retic_check_threesome(val, src, trg, msg, line):
     if hasattr(val, '__actual__'):
         nsrc, tm, _, tmsg, tline = val.__cast__
-        print("HAS", tm, src, trg)
         join = n_info_join(tm, src, trg)
         actual = val.__actual__
     else: 
         actual = val
         join = info_join(src, trg)
-        print("NO", src, trg)
         nsrc = src
     retic_assert(join.top_free(), val, msg)
     return actual, nsrc, join 
@@ -413,95 +673,103 @@ def retic_make_proxy(val, src, trg, msg, line, ext_join=None):
 def retic_mergecast(val, src, trg, msg, line):
     return retic_cast(val, src, retic_merge(src, trg), msg, line)
 
-def retic_make_getattr(obj, src, join, trg, msg, line, function=None):
-    def n_getattr(prox, attr):
-        if attr == '__cast__':
-            return (src, join, trg, msg, line)
-        elif attr == '__actual__':
-            return obj
-        elif attr == '__getstate__':
-            if hasattr(obj, '__getstate__'):
-                return obj.__getstate__
-            else: return lambda: obj
-        elif attr == '__new__':
-            return function
-        elif function:
-            if attr == '__call__':
-                return function.__get__(prox)
-        val = getattr(obj, attr)
-        if inspect.ismethod(val) and val.__self__ is obj:
-            val = val.__func__.__get__(prox)
-        elif hasattr(val, '__self__'):
-            val = retic_make_function_wrapper(val, rtypes.Dyn, rtypes.Dyn, msg, line)
-        lsrc = src.member_type(attr, rtypes.Dyn)
-        ljoin = join.member_type(attr, rtypes.Dyn)
-        ltrg = trg.member_type(attr, rtypes.Dyn)
-        return retic_mergecast(retic_mergecast(val, lsrc, ljoin, msg, line=line), ljoin, ltrg, msg, line=line)
-    return n_getattr
-
-def retic_make_setattr(obj, src, join, trg, msg, line):
-    def n_setattr(prox, attr, val):
-        lsrc = src.member_type(attr, rtypes.Dyn)
-        ljoin = join.member_type(attr, rtypes.Dyn)
-        ltrg = trg.member_type(attr, rtypes.Dyn)
-        setattr(obj, attr, retic_mergecast(retic_mergecast(val, ltrg, ljoin, msg, line),
-                                           ljoin, lsrc, msg, line))
-    return n_setattr
-
-def retic_make_delattr(obj, src, join, trg, msg, line):
-    def n_delattr(prox, attr):
-        ljoin = join.member_type(attr, rtypes.Dyn)
-        if retic_tyinstance(ljoin, rtypes.Dyn):
-            delattr(obj, attr)
-        else: retic_error('%s at line %s' % (msg, line))
-    return n_delattr
+def retic_proxy_getattr(prox, attr):
+    if attr == '__cast__':
+        return retic_proxy_state(prox, '__cast__')
+    obj = retic_proxy_state(prox, '__actual__')
+    function = retic_proxy_state(prox, '__retic_call__')
+    if attr == '__actual__':
+        return obj
+    elif attr == '__getstate__':
+        if hasattr(obj, '__getstate__'):
+            return obj.__getstate__
+        else: return lambda: obj
+    elif attr == '__new__':
+        return function
+    elif function:
+        if attr == '__call__':
+            return function.__get__(prox)
+    src, join, trg, msg, line = retic_proxy_state(prox, '__cast__')
+    val = getattr(obj, attr)
+    if inspect.ismethod(val) and val.__self__ is obj:
+        val = val.__func__.__get__(prox)
+    elif hasattr(val, '__self__'):
+        val = retic_make_function_wrapper(val, rtypes.Dyn, rtypes.Dyn, msg, line)
+    lsrc = src.member_type(attr, rtypes.Dyn)
+    ljoin = join.member_type(attr, rtypes.Dyn)
+    ltrg = trg.member_type(attr, rtypes.Dyn)
+    return retic_mergecast(retic_mergecast(val, lsrc, ljoin, msg, line=line), ljoin, ltrg, msg, line=line)
+
+def retic_proxy_setattr(prox, attr, val):
+    obj = retic_proxy_state(prox, '__actual__')
+    src, join, trg, msg, line = retic_proxy_state(prox, '__cast__')
+    lsrc = src.member_type(attr, rtypes.Dyn)
+    ljoin = join.member_type(attr, rtypes.Dyn)
+    ltrg = trg.member_type(attr, rtypes.Dyn)
+    setattr(obj, attr, retic_mergecast(retic_mergecast(val, ltrg, ljoin, msg, line),
+                                       ljoin, lsrc, msg, line))
+
+def retic_proxy_delattr(prox, attr):
+    obj = retic_proxy_state(prox, '__actual__')
+    _, join, _, msg, line = retic_proxy_state(prox, '__cast__')
+    ljoin = join.member_type(attr, rtypes.Dyn)
+    if retic_tyinstance(ljoin, rtypes.Dyn):
+        delattr(obj, attr)
+    else: retic_error('%s at line %s' % (msg, line))
+
+retic_proxy_hooks = retic_proxy_getattr, retic_proxy_setattr, retic_proxy_delattr
+retic_proxy_slots = ('__actual__', '__cast__', '__retic_call__')
 
 def retic_getattr_static(val, attr, ty):
-    if retic_monotonic_installed(val):
-        return val.__fastgetattr__(attr)
-    else: return retic_check(getattr(val, attr), ty, 'Attribute in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)
+    getter = retic_monotonic_accessor(type(val), '__fastgetattr__')
+    if getter is not None:
+        return getter(val, attr)
+    else: return retic_check(getattr(val, attr), ty, 'Attribute in non-object value ill-typed')
 
 def retic_getattr_dynamic(val, attr, ty):
-    if retic_monotonic_installed(val):
-        return val.__getattr_attype__(attr, ty)
-    else: return retic_check(getattr(val, attr), ty, 'Attribute in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)        
+    getter = retic_monotonic_accessor(type(val), '__getattr_attype__')
+    if getter is not None:
+        return getter(val, attr, ty)
+    else: return retic_check(getattr(val, attr), ty, 'Attribute in non-object value ill-typed')        
 
 def retic_setattr_static(val, attr, written, ty):
-    if retic_monotonic_installed(val):
-        val.__fastsetattr__(attr, written)
+    setter = retic_monotonic_accessor(type(val), '__fastsetattr__')
+    if setter is not None:
+        setter(val, attr, written)
     else: # If val is not a monotonic object, fall back to casts-as-check
-        retic_check(written, ty, 'Attribute in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)
+        retic_check(written, ty, 'Attribute in non-object value ill-typed')
         setattr(val, attr, written)
 
 def retic_setattr_dynamic(val, attr, written, ty):
-    if retic_monotonic_installed(val):
-        val.__setattr_attype__(attr, written, ty)
+    setter = retic_monotonic_accessor(type(val), '__setattr_attype__')
+    if setter is not None:
+        setter(val, attr, written, ty)
     else: 
-        retic_check(written, ty, 'Attribute in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)
+        retic_check(written, ty, 'Attribute in non-object value ill-typed')
         setattr(val, attr, written)
 
 def retic_getitem_static(val, item, ty):
-    if retic_monotonic_installed(val):
+    if retic_monotonic_installed(type(val)):
         return val.__fastgetitem__(item)
-    else: return retic_check(val[item], ty, 'Item in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)
+    else: return retic_check(val[item], ty, 'Item in non-object value ill-typed')
 
 def retic_getitem_dynamic(val, item, ty):
-    if retic_monotonic_installed(val):
+    if retic_monotonic_installed(type(val)):
         return val.__getitem_attype__(item, ty)
-    else: return retic_check(val[item], ty, 'Item in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)        
+    else: return retic_check(val[item], ty, 'Item in non-object value ill-typed')        
 
 def retic_setitem_static(val, item, written, ty):
-    if retic_monotonic_installed(val):
+    if retic_monotonic_installed(type(val)):
         val.__fastsetitem__(item, written)
     else: # If val is not a monotonic object, fall back to casts-as-check
-        retic_check(written, ty, 'Item in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)
+        retic_check(written, ty, 'Item in non-object value ill-typed')
         val[item] = written
 
 def retic_setitem_dynamic(val, item, written, ty):
-    if retic_monotonic_installed(val):
+    if retic_monotonic_installed(type(val)):
         val.__setitem_attype__(item, written, ty)
     else: 
-        retic_check(written, ty, 'Item in non-object value ill-typed', line=inspect.currentframe().f_back.f_lineno)
+        retic_check(written, ty, 'Item in non-object value ill-typed')
         val[item] = written
 
 
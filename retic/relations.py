@@ -49,7 +49,7 @@ def info_join(ty1, ty2):
             return Dict(ijoin(ty1.keys, ty2.keys), ijoin(ty1.values, ty2.values))
         elif tyinstance(ty1, Tuple) and tyinstance(ty2, Tuple):
             if len(ty1.elements) == len(ty2.elements):
-                Tuple(*[ijoin(e1, e2) for (e1, e2) in zip(ty1.elements, ty2.elements)])
+                return Tuple(*[ijoin(e1, e2) for (e1, e2) in zip(ty1.elements, ty2.elements)])
             else: return InfoTop
         elif tyinstance(ty1, Structural) and tyinstance(ty2, Structural) and \
              (tyinstance(ty1, Object) or tyinstance(ty2, Object)):
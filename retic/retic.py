@@ -3,7 +3,7 @@ from __future__ import print_function
 from . import typing, flags, utils, exc, repl, typecheck, runtime, static, object_check_collector
 import sys, argparse, ast, os, os.path
 import __main__
-from .importer import make_importer
+from .importer import make_importer, close_world
 
 if flags.PY_VERSION == 3:
     from .exec3 import _exec
@@ -41,6 +41,9 @@ def reticulate(input, prog_args=None, flag_sets=None, answer_var=None, **individ
 
     type_system = static.StaticTypeSystem()
 
+    if flags.CLOSED_WORLD:
+        close_world(py_ast, module_name)
+
     if flags.DRY_RUN:
         typed_ast = py_ast
     else:
@@ -130,6 +133,10 @@ def main():
                         default=False, help='instead of executing the program, print out the modified program (comments and formatting will be lost)')
     parser.add_argument('-ni', '--no-imports', dest='typecheck_imports', action='store_false', 
                         default=True, help='do not typecheck or cast-insert imported modules')
+    parser.add_argument('--closed-world', dest='closed_world', action='store_true',
+                        default=False, help='assume the program and the modules it imports are all the code that will run, and skip the argument checks of calls from typed code to typed top-level functions, and the return checks of calls to functions that check their own returns (which are otherwise all kept)')
+    parser.add_argument('--infer-returns', dest='infer_returns', action='store_true',
+                        default=False, help='infer the return types of unannotated top-level functions from their bodies (implies --closed-world)')
     typings = parser.add_mutually_exclusive_group()
     typings.add_argument('--transient', '--casts-as-check', dest='semantics', action='store_const', const='TRANS',
                          help='use the casts-as-checks runtime semantics (the default)')
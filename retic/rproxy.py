@@ -1,5 +1,37 @@
-def create_proxy(obj, metaclass=type):
-    supe = object if any(isinstance(obj, t) for t in [type, type(lambda x:x), bool, type(None), type(...)])\
+# Proxy classes are shared between every proxy of the same type of
+# value, so the per-cast state (the underlying value, the threesome,
+# etc.) lives on each proxy instance, and the runtime's attribute
+# hooks read it from there. The state is kept in __slots__ named by
+# the runtime, where the proxied type allows it.
+proxy_classes = {}
+proxy_types = set()
+
+def create_proxy(obj, hooks, slots=(), metaclass=type):
+    key = type(obj), metaclass, hooks
+    try:
+        return proxy_classes[key]
+    except KeyError:
+        Proxy = proxy_classes[key] = build_proxy(obj, hooks, slots)
+        proxy_types.add(Proxy)
+        return Proxy
+
+# Whether a value is a proxy; its own attributes can't tell, since
+# they're looked up through the hooks
+def is_proxy(val):
+    return type(val) in proxy_types
+
+# Proxies never copy the contents of the wrapped value into themselves:
+# everything is delegated through the hooks. Builtin containers are
+# therefore proxied by plain objects rather than by subclasses, whose
+# own (empty) storage C code such as json would read directly;
+# isinstance still works, through __class__, and the reflected
+# operations that a builtin only tries after its own are delegated
+# below. C code that requires a real container rejects the proxy
+# instead of seeing it as empty.
+unsubclassed = [type, type(lambda x:x), bool, type(None), type(...), list, tuple, dict, set, frozenset]
+
+def build_proxy(obj, hooks, slots):
+    supe = object if any(isinstance(obj, t) for t in unsubclassed)\
         else obj.__class__
     if isinstance(obj, type):
         supe = type
@@ -7,16 +39,24 @@ def create_proxy(obj, metaclass=type):
         class Test(supe): pass
     except TypeError:
         supe = object
-    odir = dir(obj) if not isinstance(obj, type) else [] 
+    # Subclasses of variable-sized builtins (int, tuple, type, ...) can't
+    # have nonempty __slots__, so their proxies keep a __dict__
+    if not hasattr(supe, '__weakref__'):
+        slots = tuple(slots) + ('__weakref__',)
+    try:
+        class Test(supe):
+            __slots__ = slots
+    except TypeError:
+        slots = None
+    odir = dir(type(obj)) if not isinstance(obj, type) else [] 
     class Proxy(supe, metaclass=type(supe)):
+        if slots is not None:
+            __slots__ = slots
+        __getattribute__, __setattr__, __delattr__ = hooks
+
         def __init__(self, *args, **kwds):
-            if isinstance(obj, type):
-                return
-            if obj.__class__.__module__ == 'builtins':
-                try:
-                    super().__init__(obj)
-                except TypeError:
-                    pass
+            pass
+
         if '__next__' in odir:
             def __next__(self, *args, **kwds):
                 return self.__next__(*args, **kwds)
@@ -333,5 +373,23 @@ def create_proxy(obj, metaclass=type):
             def __setitem__(self, *args, **kwds):
                 return self.__setitem__(*args, **kwds)
 
+        if isinstance(obj, (list, tuple)):
+            def __radd__(self, other, base=type(obj)):
+                if isinstance(other, base):
+                    return other + base(self)
+                return NotImplemented
+
     return Proxy
 
+
+def set_state(prox, **state):
+    for k in state:
+        object.__setattr__(prox, k, state[k])
+
+def get_state(prox, attr):
+    return object.__getattribute__(prox, attr)
+
+def instantiate(Proxy, obj, **state):
+    prox = Proxy()
+    set_state(prox, **state)
+    return prox
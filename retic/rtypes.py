@@ -1,4 +1,4 @@
-import inspect, ast
+import inspect, ast, types
 from . import flags
 
 TYPES = ['Base', 'Structural', 'PyType', 'Void', 'InferBottom', 'InfoTop', 'TypeVariable', 'Self',
@@ -22,6 +22,19 @@ class Base(object):
         return self
 class Structural(object):
     pass
+
+# Types are never changed in place once built, so the structure of
+# each one is only computed the first time it's asked for. The
+# structure is shared by everyone who asks, so it must not be changed
+# either; copy() it first
+def memoized_structure(structure):
+    def memoized(self):
+        try:
+            return self.__dict__['_structure']
+        except KeyError:
+            obj = self._structure = structure(self)
+            return obj
+    return memoized
 class PyType(object):
     def to_ast(self):
         return ast.Name(id=self.__class__.__name__, ctx=ast.Load())
@@ -97,28 +110,28 @@ class Dyn(PyType, Base):
         return self
 class Bytes(PyType, Base, Structural):
     builtin = bytes
+    @memoized_structure
     def structure(self):
-        obj = Record({key: Dyn for key in dir(b'10')})
-        return obj
+        return Record(builtin_members[bytes])
 class Int(PyType, Base, Structural):
     builtin = int
+    @memoized_structure
     def structure(self):
-        obj = Record({key: Dyn for key in dir(b'10')})
-        return obj
+        return Record(builtin_members[bytes])
 class Float(PyType, Base):
     builtin = float
 class Complex(PyType, Base):
     builtin = complex
 class String(PyType, Base, Structural):
     builtin = str
+    @memoized_structure
     def structure(self):
-        obj = Record({key: Dyn for key in dir('Hello World')})
-        return obj
+        return Record(builtin_members[str])
 class Bool(PyType, Base, Structural):
     builtin = bool
+    @memoized_structure
     def structure(self):
-        obj = Record({key: Dyn for key in dir(True)})
-        return obj
+        return Record(builtin_members[bool])
 class Function(PyType, Structural):
     def __init__(self, froms, to):
         self.to = to
@@ -148,8 +161,9 @@ class Function(PyType, Structural):
                         keywords=[], starargs=None, kwargs=None)
     def __str__(self):
         return 'Function(%s, %s)' % (self.froms, self.to)
+    @memoized_structure
     def structure(self):
-        return Record({key: Dyn for key in dir(lambda x: None)})
+        return Record(builtin_members[type(lambda x: None)])
     def substitute(self, var, ty, shallow):
         return Function(self.froms.substitute(var, ty, shallow), self.to.substitute(var, ty, shallow))
     def substitute_alias(self, var, ty):
@@ -182,8 +196,9 @@ class List(PyType, Structural):
                         keywords=[], starargs=None, kwargs=None)
     def __str__(self):
         return 'List(%s)' % self.type
+    @memoized_structure
     def structure(self):
-        obj = {key: Dyn for key in dir([])}
+        obj = builtin_members[list].copy()
         obj['__setitem__'] = Function([Int, self.type], Void)
         obj['__getitem__'] = Function([Int], self.type)
         obj['append'] = Function([self.type], Void)
@@ -220,8 +235,9 @@ class Dict(PyType, Structural):
                         keywords=[], starargs=None, kwargs=None)
     def __str__(self):
         return 'Dict(%s, %s)' % (self.keys, self.values)    
+    @memoized_structure
     def structure(self):
-        obj = {key: Dyn for key in dir({})}
+        obj = builtin_members[dict].copy()
         obj['__setitem__'] = Function([self.keys, self.values], Void)
         obj['__getitem__'] = Function([self.keys], self.values)
         obj['copy'] = Function([], Dict(self.keys, self.values))
@@ -260,9 +276,9 @@ class Tuple(PyType, Structural):
                         keywords=[], starargs=None, kwargs=None)
     def __str__(self):
         return 'Tuple(%s)' % (','.join([str(elt) for elt in self.elements]))
+    @memoized_structure
     def structure(self):
-        obj = {key: Dyn for key in dir(())}
-        return Object('',obj)
+        return Object('', builtin_members[tuple])
     def substitute(self, var, ty, shallow):
         return Tuple(*[e.substitute(var, ty, shallow) for e in self.elements])
     def substitute_alias(self, var, ty):
@@ -314,10 +330,10 @@ class Set(PyType, Structural):
                         starargs=None, kwargs=None)
     def __str__(self):
         return 'Set(%s)' % str(self.type)
+    @memoized_structure
     def structure(self):
         # Not yet defining specific types
-        obj = {key: Dyn for key in dir({1})}
-        return Object('',obj)
+        return Object('', builtin_members[set])
     def substitute(self, var, ty, shallow):
         return Set(self.type.substitute(var, ty, shallow))
     def substitute_alias(self, var, ty):
@@ -332,6 +348,7 @@ class Object(PyType, Structural):
     def __init__(self, name, members):
         self.name = name
         self.members = members.copy()
+        self.resolved = {}
     def __str__(self):
         return 'Object(%s, %s)' % (self.name, str(self.members))
     def __eq__(self, other):
@@ -362,12 +379,14 @@ class Object(PyType, Structural):
     def lift(self):
         return Object(self.name, {k:self.members[k].lift() for k in self.members})
     def member_type(self, member, default=None):
-        try:
-            return self.members[member].copy().substitute(self.name, self, True)
-        except KeyError as e:
-            if default:
-                return default
-            else: raise e
+        if member not in self.resolved:
+            try:
+                self.resolved[member] = self.members[member].copy().substitute(self.name, self, True)
+            except KeyError as e:
+                if default:
+                    return default
+                else: raise e
+        return self.resolved[member]
     def structure(self):
         return self
     def roll(self, env):
@@ -381,6 +400,13 @@ class Class(PyType, Structural):
         self.name = name
         self.members = members.copy()
         self.instance_members = instance_members.copy()
+        self.forget()
+    # Instances and member types are resolved once per class type; this
+    # must be called if its members are changed in place
+    def forget(self):
+        self.inst = None
+        self.resolved = {}
+        self.resolved_instance = {}
     def __str__(self):
         return 'Class(%s, %s, %s)' % (self.name, str(self.members), str(self.instance_members) if self.instance_members else '')
     def __eq__(self, other):
@@ -417,6 +443,8 @@ class Class(PyType, Structural):
             return self
         return Class(self.name, {k:self.members[k].substitute(var, ty, False) for k in self.members}, {k:self.instance_members[k].substitute(var, ty, False) for k in self.instance_members})
     def instance(self):
+        if self.inst is not None:
+            return self.inst
         inst_dict = self.instance_members.copy()
         for k in self.members:
             f = self.members[k]
@@ -425,7 +453,8 @@ class Class(PyType, Structural):
             elif tyinstance(f, Function):
                 inst_dict[k] = f.bind()
             else: inst_dict[k] = f
-        return Object(self.name, inst_dict)
+        self.inst = Object(self.name, inst_dict)
+        return self.inst
     def copy(self):
         return Class(self.name, {k:self.members[k].copy() for k in self.members}, 
                      {k:self.instance_members[k].copy() for k in self.instance_members})
@@ -433,19 +462,23 @@ class Class(PyType, Structural):
         return Class(self.name, {k:self.members[k].lift() for k in self.members}, 
                      {k:self.instance_members[k].lift() for k in self.instance_members})
     def member_type(self, member, default=None):
-        try:
-            return self.members[member].copy().substitute(self.name, self.instance(), True).substitute(self.name + '.Class', self, True)
-        except KeyError as e:
-            if default:
-                return default
-            else: raise e
+        if member not in self.resolved:
+            try:
+                self.resolved[member] = self.members[member].copy().substitute(self.name, self.instance(), True).substitute(self.name + '.Class', self, True)
+            except KeyError as e:
+                if default:
+                    return default
+                else: raise e
+        return self.resolved[member]
     def instance_member_type(self, member, default=None):
-        try:
-            return self.instance_members[member].copy().substitute(self.name, self.instance(), True).substitute(self.name + '.Class', self, True)
-        except KeyError as e:
-            if default:
-                return default
-            else: raise e
+        if member not in self.resolved_instance:
+            try:
+                self.resolved_instance[member] = self.instance_members[member].copy().substitute(self.name, self.instance(), True).substitute(self.name + '.Class', self, True)
+            except KeyError as e:
+                if default:
+                    return default
+                else: raise e
+        return self.resolved_instance[member]
     def structure(self):
         return self
     def roll(self, env):
@@ -639,6 +672,11 @@ InferBottom = InferBottom()
 InfoTop = InfoTop()
 Self = Self()
 
+# Members of the builtin values that structural types stand for,
+# read-only since every structure built from them shares them
+builtin_members = {type(val): types.MappingProxyType({key: Dyn for key in dir(val)}) for val in
+                   [b'10', 'Hello World', True, lambda x: None, [], {}, (), {1}]}
+
 def Record(dct):
     return Object('', dct)
 
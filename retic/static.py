@@ -1,3 +1,4 @@
+import ast
 from . import importer
 from . import gatherers
 from . import typing
@@ -69,8 +70,7 @@ class StaticTypeSystem:
         check_that_subtypes_hold(misc, fixed, subchecks)
         logging.debug('Alias resolution finished in %s' % misc.filename, flags.PROC)
 
-        # Collect variables whose types need to be inferred, and perform inference
-        logging.debug('Inference starting in %s' % misc.filename, flags.PROC)
+        # Collect variables whose types need to be inferred
         typechecker = typechecker_visitor()
         inferred = inferfinder.Inferfinder(True, misc).preorder(n)
         inferred = exclude_fixed(inferred, fixed)
@@ -78,6 +78,32 @@ class StaticTypeSystem:
         ext.update(env)
         env = ext
         env = merge(misc,env, lift(classes))
+
+        # Inferred return types only stand if the module still
+        # typechecks with them, and are never exported: other modules
+        # see the declared types, and so still check the returns
+        if flags.INFER_RETURNS and flags.SEMANTICS == 'TRANS' and flags.STATIC_ERRORS and \
+                isinstance(n, ast.Module):
+            logging.debug('Return inference starting in %s' % misc.filename, flags.PROC)
+            returns = inference.infer_returns(typechecker, n, env, misc)
+            logging.debug('Return inference finished in %s' % misc.filename, flags.PROC)
+            if returns:
+                rfixed = fixed.copy()
+                rfixed.update(returns)
+                renv = env.copy()
+                renv.update(returns)
+                try:
+                    prog, renv = self.infer_and_check(typechecker, n, inferred, rfixed, renv, misc)
+                except StaticTypeError:
+                    pass
+                else:
+                    renv.update({var: env[var] for var in returns})
+                    return prog, renv
+        return self.infer_and_check(typechecker, n, inferred, fixed, env, misc)
+
+    def infer_and_check(self, typechecker, n, inferred, fixed, env, misc):
+        # Perform inference
+        logging.debug('Inference starting in %s' % misc.filename, flags.PROC)
         env = inference.InferVisitor().infer(typechecker, inferred, fixed, n, env, misc)
         logging.debug('Inference finished in %s' % misc.filename, flags.PROC)
 
@@ -193,6 +219,7 @@ def propagate_inheritance(defs, inheritance, externals):
             mems.update(defs[Var(cls)].members)
             defs[Var(cls)].members.clear()
             defs[Var(cls)].members.update(mems)
+            defs[Var(cls)].forget()
             subchecks.append((Var(cls), src))
     return defs, subchecks
 
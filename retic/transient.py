@@ -1,7 +1,7 @@
 from .runtime import has_type as retic_has_type
 from .relations import tyinstance as retic_tyinstance
 from . import rtypes
-import inspect
+import inspect, sys
 from .exc import RuntimeTypeError
 
 class CastError(RuntimeTypeError):
@@ -34,6 +34,19 @@ def retic_cast(val, src, trg, msg):
     retic_assert(retic_has_type(val, trg), val, msg, exc)
     return val
 
+# Called from the handler around a statement whose attribute reads
+# were not checked in advance, with the attributes and the blame for
+# each; the handler re-raises the original error if this doesn't raise
+# a blame error. Only a lookup that the statement itself made (rather
+# than something it called) is blamed.
+def retic_width_error(reads):
+    _, exc, tb = sys.exc_info()
+    if tb.tb_next is None and not isinstance(exc, RuntimeTypeError):
+        value, _, missing = str(exc).partition(' has no attribute ')
+        for attr, msg in reads:
+            if missing.endswith(attr + '\''):
+                raise ObjectTypeAttributeCheckError(msg % value if msg else msg)
+
 def retic_check(val, trg, msg):
     if retic_tyinstance(trg, rtypes.Object):
         exc = ObjectTypeAttributeCheckError
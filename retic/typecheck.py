@@ -1,7 +1,9 @@
 from __future__ import print_function
 import ast
 from .vis import Visitor
-from .gatherers import FallOffVisitor, WILL_RETURN
+from .gatherers import FallOffVisitor, Bindingfinder, Escapefinder, Stringfinder, Yieldfinder, Localfinder, \
+    Globalfinder, Deferredfinder, WILL_RETURN, dynamic_scope
+from .importer import referenced_elsewhere
 from .inference import InferVisitor
 from .typing import *
 from .relations import *
@@ -23,6 +25,14 @@ def fixup(n, lineno=None, col_offset=None):
 
 ##Cast insertion functions##
 #Normal casts
+# The guarded and monotonic runtimes report, and record in their proxies,
+# the line a cast or check was inserted at; it's known statically, so
+# pass it in rather than having the runtime look up the caller's frame.
+def runtime_args(args, lineno):
+    if flags.SEMANTICS in ['MONO', 'GUARDED']:
+        return args + [ast.Num(n=lineno)]
+    else: return args
+
 def cast(env, ctx, val, src, trg, msg, cast_function='retic_cast', misc=None):
     if flags.SEMANTICS == 'MGDTRANS':
         from . import mgd_typecheck
@@ -43,14 +53,14 @@ def cast(env, ctx, val, src, trg, msg, cast_function='retic_cast', misc=None):
         msg = '\n' + msg
         logging.warn('Inserting cast at line %s: %s => %s' % (lineno, src, trg), 2)
         return fixup(ast.Call(func=ast.Name(id=cast_function, ctx=ast.Load()),
-                              args=[val, src.to_ast(), merged.to_ast(), ast.Str(s=msg)],
+                              args=runtime_args([val, src.to_ast(), merged.to_ast(), ast.Str(s=msg)], val.lineno),
                               keywords=[], starargs=None, kwargs=None), val.lineno)
     else:
         msg = '\n' + msg
         if flags.SEMANTICS == 'MONO':
             logging.warn('Inserting cast at line %s: %s => %s' % (lineno, src, trg), 2)
             return fixup(ast.Call(func=ast.Name(id=cast_function, ctx=ast.Load()),
-                                  args=[val, src.to_ast(), merged.to_ast(), ast.Str(s=msg)],
+                                  args=runtime_args([val, src.to_ast(), merged.to_ast(), ast.Str(s=msg)], val.lineno),
                                   keywords=[], starargs=None, kwargs=None), val.lineno)
         elif flags.SEMANTICS == 'TRANS':
             if not tyinstance(trg, Dyn):
@@ -101,7 +111,7 @@ def cast(env, ctx, val, src, trg, msg, cast_function='retic_cast', misc=None):
         elif flags.SEMANTICS == 'GUARDED':
             logging.warn('Inserting cast at line %s: %s => %s' % (lineno, src, trg), 2)
             return fixup(ast.Call(func=ast.Name(id=cast_function, ctx=ast.Load()),
-                                  args=[val, src.to_ast(), merged.to_ast(), ast.Str(s=msg)],
+                                  args=runtime_args([val, src.to_ast(), merged.to_ast(), ast.Str(s=msg)], val.lineno),
                                   keywords=[], starargs=None, kwargs=None), val.lineno)
         elif flags.SEMANTICS == 'NOOP':
             return val
@@ -121,7 +131,7 @@ def check(val, trg, msg, check_function='retic_check', lineno=None, ulval=None):
     if not flags.OPTIMIZED_INSERTION:
         logging.warn('Inserting check at line %s: %s' % (lineno, trg), 2)
         return fixup(ast.Call(func=ast.Name(id=check_function, ctx=ast.Load()),
-                              args=[val, trg.to_ast(), ast.Str(s=msg)],
+                              args=runtime_args([val, trg.to_ast(), ast.Str(s=msg)], val.lineno),
                               keywords=[], starargs=None, kwargs=None), val.lineno)
     else:
         if flags.SEMANTICS == 'TRANS':
@@ -209,6 +219,165 @@ def error_stmt(msg, lineno, error_function='retic_error'):
     else:
         return [ast.Expr(value=error(msg, lineno, error_function), lineno=lineno)]
 
+# Under monotonic semantics, a data attribute that a class declares
+# can never come to hold a value less precise than its declared type,
+# so reading it from the receiver of one of the class's own methods
+# needs no runtime support. Methods are still read through
+# retic_getattr_*, which binds them without casting.
+def monotonic_invariant(cls, attr, ty):
+    return flags.SEMANTICS == 'MONO' and cls is not None and \
+        (attr in cls.instance_members or attr in cls.members) and \
+        not tyinstance(ty, Function)
+
+# Under transient semantics, checking that a value has an attribute
+# just before reading it repeats the lookup that the read itself makes.
+# Reads in simple statements are left to fail on their own, and are
+# recorded so that the statement can be wrapped in a handler that
+# gives a failed lookup the check's blame (see visitlist)
+def elided_width_check(n, misc):
+    if flags.SEMANTICS == 'TRANS' and flags.OPTIMIZED_INSERTION and not flags.SEMI_DRY and \
+            isinstance(n.ctx, ast.Load) and misc.width_reads is not None:
+        msg = '' if flags.SQUELCH_MESSAGES else '\n' + errmsg('WIDTH_DOWNCAST', misc.filename, n, n.attr)
+        misc.width_reads.append((n.attr, msg))
+        return True
+    return False
+
+def width_handler(stmts, reads, lineno):
+    reads = ast.Tuple(elts=[ast.Tuple(elts=[ast.Str(s=attr), ast.Str(s=msg)], ctx=ast.Load())
+                            for attr, msg in reads], ctx=ast.Load())
+    handler = ast.ExceptHandler(type=ast.Name(id='AttributeError', ctx=ast.Load()), name=None,
+                                body=[ast.Expr(value=ast.Call(func=ast.Name(id='retic_width_error', ctx=ast.Load()),
+                                                              args=[reads], keywords=[], starargs=None,
+                                                              kwargs=None)),
+                                      ast.Raise(exc=None, cause=None)])
+    if flags.PY_VERSION == 3 and flags.PY3_VERSION >= 3:
+        return fixup(ast.Try(body=stmts, handlers=[handler], orelse=[], finalbody=[]), lineno)
+    else: return fixup(ast.TryExcept(body=stmts, handlers=[handler], orelse=[]), lineno)
+
+# The kind of constant a literal element is, if it is one: the class
+# of its value, counting signed numbers as numbers
+def constant_kind(n):
+    if isinstance(n, ast.UnaryOp) and isinstance(n.op, (ast.UAdd, ast.USub)):
+        n = n.operand
+        return type(n.n) if isinstance(n, ast.Num) else None
+    elif isinstance(n, ast.Num):
+        return type(n.n)
+    elif isinstance(n, ast.Str):
+        return str
+    elif isinstance(n, ast.Bytes):
+        return bytes
+    elif isinstance(n, ast.NameConstant):
+        return type(n.value)
+    else: return None
+
+# What the rest of a module can rely on about one of its top-level
+# functions: every call through its name is known to reach the
+# definition, because it is bound nowhere else in the module
+class FunctionSummary(object):
+    def __init__(self, unchecked, checks_return, closed):
+        # Name of a second entry point without argument checks, which
+        # statically typed callers can use directly, or None
+        self.unchecked = unchecked
+        # Whether every return from the body is already cast to the
+        # declared return type, so that callers need not check it
+        self.checks_return = checks_return
+        # Whether, in a closed world, only typed calls can reach the
+        # function, so that it need not check its arguments at all
+        self.closed = closed
+
+def function_summaries(n, env, filename):
+    if flags.SEMI_DRY:
+        return {}
+    bindings = Bindingfinder().preorder(n)
+    if '*' in bindings:
+        return {}
+    escaping = Escapefinder().preorder(n) if flags.CLOSED_WORLD else None
+    strings = Stringfinder().preorder(n) if flags.CLOSED_WORLD else None
+    summaries = {}
+    for stmt in n.body:
+        if not isinstance(stmt, ast.FunctionDef) or stmt.decorator_list or \
+                bindings.count(stmt.name) != 1:
+            continue
+        nty = env.get(Var(stmt.name), Dyn)
+        if not tyinstance(nty, Function) or tyinstance(nty.froms, DynParameters):
+            continue
+        tys = nty.froms.types(nty.froms.len())
+        if any(isinstance(ty, TypeVariable) for ty in tys + [nty.to]):
+            continue
+        name = stmt.name if stmt.name not in rtypes.TYPES else stmt.name + '_'
+        # Calls can only bypass the public binding, or trust it to
+        # check its own returns, when nothing can rebind it: in a
+        # closed world, when no other module refers to the name, and
+        # this one neither spells it in a string nor reaches its
+        # globals through globals() and friends
+        fixed = escaping is not None and not escaping & dynamic_scope and \
+            stmt.name not in strings and not referenced_elsewhere(filename, stmt.name)
+        arg = ast.Name(id=stmt.name, ctx=ast.Load(), lineno=stmt.lineno)
+        unchecked = 'retic_unchecked_%s' % name if fixed and \
+            flags.SEMANTICS == 'TRANS' and flags.OPTIMIZED_INSERTION and \
+            any(check(arg, ty, '') is not arg for ty in tys) else None
+        closed = unchecked is not None and stmt.name not in escaping
+        if closed:
+            unchecked = None
+        checks_return = fixed and not Yieldfinder().dispatch_statements(stmt.body)
+        summaries[name] = FunctionSummary(unchecked, checks_return, closed)
+    return summaries
+
+# Types that a successful isinstance test against a builtin class
+# proves; containers only prove their type under transient, where
+# casting to them does not wrap the value
+narrowing_classes = {'int': Int, 'float': Float, 'complex': Complex, 'str': String,
+                     'bytes': Bytes, 'bool': Bool}
+narrowing_containers = {'list': List(Dyn), 'dict': Dict(Dyn, Dyn), 'set': Set(Dyn)}
+
+# The types that a test proves for local variables when it succeeds
+# and when it fails
+def narrowings(test, env, misc):
+    def builtin(name):
+        return isinstance(name, ast.Name) and Var(name.id) not in env
+    def local(name):
+        return isinstance(name, ast.Name) and name.id in misc.narrowable and \
+            tyinstance(env.get(Var(name.id), Dyn), Dyn)
+    if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+        then, orelse = narrowings(test.operand, env, misc)
+        return orelse, then
+    elif isinstance(test, ast.BoolOp) and isinstance(test.op, ast.And):
+        then = {}
+        for value in test.values:
+            then.update(narrowings(value, env, misc)[0])
+        return then, {}
+    elif isinstance(test, ast.Call) and builtin(test.func) and not test.keywords and \
+            len(test.args) == 2 and test.func.id == 'isinstance' and \
+            local(test.args[0]) and builtin(test.args[1]):
+        classes = dict(narrowing_classes)
+        if flags.SEMANTICS == 'TRANS':
+            classes.update(narrowing_containers)
+        if test.args[1].id in classes:
+            return {test.args[0].id: classes[test.args[1].id]}, {}
+    elif isinstance(test, ast.Call) and builtin(test.func) and not test.keywords and \
+            len(test.args) == 1 and test.func.id == 'callable' and local(test.args[0]):
+        return {test.args[0].id: Function(DynParameters, Dyn)}, {}
+    elif isinstance(test, ast.Compare) and len(test.ops) == 1 and local(test.left) and \
+            isinstance(test.comparators[0], ast.NameConstant) and test.comparators[0].value is None:
+        if isinstance(test.ops[0], ast.Is):
+            return {test.left.id: Void}, {}
+        elif isinstance(test.ops[0], ast.IsNot):
+            return {}, {test.left.id: Void}
+    return {}, {}
+
+# The environment for a branch guarded by a test, with the narrowed
+# variables that the branch cannot rebind before using them
+def narrowed(env, narrowing, body):
+    if not narrowing or not flags.STATIC_ERRORS or Deferredfinder().dispatch_statements(body):
+        return env
+    bound = Bindingfinder().preorder(body)
+    narrowing = {x: narrowing[x] for x in narrowing if x not in bound}
+    if not narrowing:
+        return env
+    env = env.copy()
+    env.update({Var(x): narrowing[x] for x in narrowing})
+    return env
+
 class Typechecker(Visitor):
     falloffvisitor = FallOffVisitor()
 
@@ -242,11 +411,22 @@ class Typechecker(Visitor):
     def visitlist(self, n, env, misc):
         body = []
         for s in n:
-            stmts = self.dispatch(s, env, misc)
+            # Width checks are only elided from simple statements,
+            # where a failed read can't be confused with one made in a
+            # body the statement runs
+            if hasattr(s, 'body'):
+                smisc = typing.Misc(width_reads=None, extend=misc) if misc.width_reads is not None else misc
+                stmts = self.dispatch(s, env, smisc)
+            else:
+                smisc = typing.Misc(width_reads=[], extend=misc)
+                stmts = self.dispatch(s, env, smisc)
+                if smisc.width_reads and stmts:
+                    stmts = [width_handler(stmts, smisc.width_reads, s.lineno)]
             body += stmts
         return body
         
     def visitModule(self, n, env, misc):
+        misc.summaries = function_summaries(n, env, misc.filename)
         body = self.dispatch(n.body, env, misc)
         return ast.Module(body=body)
 
@@ -275,6 +455,11 @@ class Typechecker(Visitor):
 
         froms = nty.froms if hasattr(nty, 'froms') else DynParameters#[Dyn] * len(argnames)
         to = nty.to if hasattr(nty, 'to') else Dyn
+        # While its return type is being inferred, the function's
+        # returns are collected rather than checked
+        returns = misc.return_types.get(n.name) if not misc.cls else None
+        if returns is not None:
+            to = Dyn
 
         if not misc.methodscope and not nty.self_free():
             error(errmsg('UNSCOPED_SELF', misc.filename, n), lineno=n.lineno)
@@ -301,7 +486,9 @@ class Typechecker(Visitor):
         assert(argtys != None)
         initial_locals = dict(argtys + specials)
         logging.debug('Function %s typechecker starting in %s' % (n.name, misc.filename), flags.PROC)
-        body, _ = misc.static.typecheck(n.body, env, initial_locals, typing.Misc(ret=to, cls=misc.cls, receiver=receiver, extenv=misc.extenv, gensymmer=misc.gensymmer, typenames=misc.typenames, extend=misc))
+        narrowable = ({var.var for var in initial_locals} | Localfinder().preorder(n.body)) - \
+            Globalfinder().preorder(n.body)
+        body, _ = misc.static.typecheck(n.body, env, initial_locals, typing.Misc(ret=to, cls=misc.cls, receiver=receiver, extenv=misc.extenv, gensymmer=misc.gensymmer, typenames=misc.typenames, narrowable=narrowable, returns=returns, extend=misc))
         logging.debug('Function %s typechecker finished in %s' % (n.name, misc.filename), flags.PROC)
         
         force_checks = tyinstance(froms, DynParameters)
@@ -310,16 +497,30 @@ class Typechecker(Visitor):
                                         errmsg('ARG_CHECK', misc.filename, n, arg.var, ty), \
                                             lineno=n.lineno) for (arg, ty) in argtys), [])
 
+        summary = misc.summaries.get(name) if not misc.cls else None
+        if summary and summary.closed:
+            argchecks = []
+
         logging.debug('Returns checker starting in %s' % misc.filename, flags.PROC)
         fo = self.falloffvisitor.dispatch_statements(body)
         logging.debug('Returns checker finished in %s' % misc.filename, flags.PROC)
         if to != Dyn and to != Void and fo != WILL_RETURN:
             return error_stmt(errmsg('FALLOFF', misc.filename, n, n.name, to), n.lineno)
+        if returns is not None and fo != WILL_RETURN:
+            returns.append(Void)
             
-        return [ast_trans.FunctionDef(name=name, args=args,
+        defs = [ast_trans.FunctionDef(name=name, args=args,
                                       body=argchecks+body, decorator_list=decorator_list,
                                       returns=(n.returns if hasattr(n, 'returns') else None),
-                                      lineno=n.lineno), assign]
+                                      lineno=n.lineno)]
+        # Typed callers, which check the arguments themselves, call
+        # this copy instead of the public binding
+        if summary and summary.unchecked:
+            defs.append(ast_trans.FunctionDef(name=summary.unchecked, args=args,
+                                              body=body, decorator_list=decorator_list,
+                                              returns=(n.returns if hasattr(n, 'returns') else None),
+                                              lineno=n.lineno))
+        return defs + [assign]
 
     def visitarguments(self, n, env, nparams, misc, lineno):
         def argextract(arg):
@@ -384,8 +585,11 @@ class Typechecker(Visitor):
             value = cast(env, misc.cls, value, ty, misc.ret, errmsg('RETURN_ERROR', misc.filename, n, misc.ret), misc=misc)
         else:
             value = None
+            ty = Void
             if not subcompat(Void, misc.ret):
                 return error_stmt(errmsg('RETURN_NONEXISTANT', misc.filename, n, misc.ret), lineno=n.lineno)
+        if misc.returns is not None:
+            misc.returns.append(ty)
         return [ast.Return(value=value, lineno=n.lineno)]
 
     # Assignment stuff
@@ -446,10 +650,30 @@ class Typechecker(Visitor):
     # Control flow stuff
     def visitIf(self, n, env, misc):
         test, tty = self.dispatch(n.test, env, misc)
-        body = self.dispatch(n.body, env, misc)
-        orelse = self.dispatch(n.orelse, env, misc) if n.orelse else []
+        then, otherwise = narrowings(n.test, env, misc)
+        body = self.dispatch_narrowed(n.body, env, then, misc)
+        orelse = self.dispatch_narrowed(n.orelse, env, otherwise, misc) if n.orelse else []
         return [ast.If(test=test, body=body, orelse=orelse, lineno=n.lineno)]
 
+    # A narrowed type only removes checks: where the code uses the
+    # variable in a way its narrowed type rules out, as when an int is
+    # passed where an object is expected, the branch is typechecked
+    # with the variable's declared type instead. The returns that the
+    # failed attempt collected are dropped, and nothing is narrowed
+    # inside the branch the second time, so that a failure isn't
+    # retried again at every level of nesting beneath it
+    def dispatch_narrowed(self, body, env, narrowing, misc):
+        nenv = narrowed(env, narrowing, body)
+        if nenv is not env:
+            returns = len(misc.returns) if misc.returns is not None else None
+            try:
+                return self.dispatch(body, nenv, misc)
+            except StaticTypeError:
+                if returns is not None:
+                    del misc.returns[returns:]
+                misc = typing.Misc(narrowable=frozenset(), extend=misc)
+        return self.dispatch(body, env, misc)
+
     def visitFor(self, n, env, misc):
         target, tty = self.dispatch(n.target, env, misc)
         iter, ity = self.dispatch(n.iter, env, misc)
@@ -471,8 +695,9 @@ class Typechecker(Visitor):
         
     def visitWhile(self, n, env, misc):
         test, tty = self.dispatch(n.test, env, misc)
-        body = self.dispatch(n.body, env, misc)
-        orelse = self.dispatch(n.orelse, env, misc) if n.orelse else []
+        then, otherwise = narrowings(n.test, env, misc)
+        body = self.dispatch_narrowed(n.body, env, then, misc)
+        orelse = self.dispatch_narrowed(n.orelse, env, otherwise, misc) if n.orelse else []
         return [ast.While(test=test, body=body, orelse=orelse, lineno=n.lineno)]
 
     def visitWith(self, n, env, misc):
@@ -669,7 +894,20 @@ class Typechecker(Visitor):
         return (ast.Compare(left=left, ops=n.ops, comparators=comparators, lineno=n.lineno), Bool)
 
     # Collections stuff    
+    # Large literal tables are usually made of constants of one kind,
+    # whose common type is the type of any one of them
+    def constants_type(self, elts, env, misc):
+        if not elts:
+            return None
+        kind = constant_kind(elts[0])
+        if kind is None or any(constant_kind(elt) is not kind for elt in elts):
+            return None
+        return self.dispatch(elts[0], env, misc)[1]
+
     def visitList(self, n, env, misc):
+        inty = self.constants_type(n.elts, env, misc) if not isinstance(n.ctx, ast.Store) else None
+        if inty is not None:
+            return ast.List(elts=n.elts, ctx=n.ctx, lineno=n.lineno), List(inty) if flags.TYPED_LITERALS else Dyn
         eltdata = [self.dispatch(x, env, misc) for x in n.elts]
         elttys = [ty for (elt, ty) in eltdata] 
         elts = [elt for (elt, ty) in eltdata]
@@ -691,14 +929,21 @@ class Typechecker(Visitor):
         return (ast.Tuple(elts=elts, ctx=n.ctx, lineno=n.lineno), ty)
 
     def visitDict(self, n, env, misc):
-        keydata = [self.dispatch(key, env, misc) for key in n.keys]
-        valdata = [self.dispatch(val, env, misc) for val in n.values]
-        keys, ktys = list(zip(*keydata)) if keydata else ([], [])
-        values, vtys = list(zip(*valdata)) if valdata else ([], [])
-        return (ast.Dict(keys=list(keys), values=list(values), lineno=n.lineno),\
-                    Dict(tyjoin(list(ktys)), tyjoin(list(vtys))))
+        def entries(nodes):
+            ty = self.constants_type(nodes, env, misc)
+            if ty is not None:
+                return nodes, ty
+            data = [self.dispatch(node, env, misc) for node in nodes]
+            nodes, tys = list(zip(*data)) if data else ([], [])
+            return list(nodes), tyjoin(list(tys))
+        keys, kty = entries(n.keys)
+        values, vty = entries(n.values)
+        return (ast.Dict(keys=keys, values=values, lineno=n.lineno), Dict(kty, vty))
 
     def visitSet(self, n, env, misc):
+        ty = self.constants_type(n.elts, env, misc)
+        if ty is not None:
+            return (ast.Set(elts=n.elts, lineno=n.lineno), Set(ty) if flags.TYPED_LITERALS else Dyn)
         eltdata = [self.dispatch(x, env, misc) for x in n.elts]
         elttys = [ty for (elt, ty) in eltdata]
         ty = tyjoin(elttys)
@@ -707,6 +952,7 @@ class Typechecker(Visitor):
         return (ast.Set(elts=elts, lineno=n.lineno), Set(ty) if flags.TYPED_LITERALS else Dyn)
 
     def visitListComp(self, n, env, misc):
+        misc = typing.Misc(width_reads=None, extend=misc)
         disp = [self.dispatch(generator, env, misc, n.lineno) for generator in n.generators]
         generators, genenv = zip(*disp) if disp else ([], [])
         lenv = env.copy()
@@ -716,6 +962,7 @@ class Typechecker(Visitor):
             (List(ety) if flags.TYPED_LITERALS else Dyn)
 
     def visitSetComp(self, n, env, misc):
+        misc = typing.Misc(width_reads=None, extend=misc)
         disp = [self.dispatch(generator, env, misc, n.lineno) for generator in n.generators]
         generators, genenv = zip(*disp) if disp else ([], [])
         lenv = env.copy()
@@ -725,6 +972,7 @@ class Typechecker(Visitor):
             (Set(ety) if flags.TYPED_LITERALS else Dyn)
     
     def visitDictComp(self, n, env, misc):
+        misc = typing.Misc(width_reads=None, extend=misc)
         disp = [self.dispatch(generator, env, misc, n.lineno) for generator in n.generators]
         generators, genenv = zip(*disp) if disp else ([], [])
         lenv = env.copy()
@@ -735,6 +983,7 @@ class Typechecker(Visitor):
             (Dict(kty, vty) if flags.TYPED_LITERALS else Dyn)
 
     def visitGeneratorExp(self, n, env, misc):
+        misc = typing.Misc(width_reads=None, extend=misc)
         disp = [self.dispatch(generator, env, misc, n.lineno) for generator in n.generators]
         generators, genenv = zip(*disp) if disp else ([], [])
         lenv = env.copy()
@@ -885,12 +1134,17 @@ class Typechecker(Visitor):
                 args = n.args
                 retty = Dyn
             
+        summary = misc.summaries.get(func.id) if isinstance(func, ast.Name) and \
+            tyinstance(ty, Function) and args is not n.args else None
+        if summary and summary.unchecked and not (n.keywords or has_kwargs(n) or has_starargs(n)):
+            func = ast.Name(id=summary.unchecked, ctx=ast.Load(), lineno=func.lineno)
         call = ast_trans.Call(func=func, args=args, keywords=n.keywords,
                               starargs=getattr(n, 'starargs', None),
                               kwargs=getattr(n, 'kwargs', None), lineno=n.lineno)
         if project_needed[0]:
             call = cast(env, misc.cls, call, Dyn, retty, errmsg('BAD_OBJECT_INJECTION', misc.filename, n, retty, ty), misc=misc)
-        else: call = check(call, retty, errmsg('RETURN_CHECK', misc.filename, n, retty))
+        elif not (summary and summary.checks_return):
+            call = check(call, retty, errmsg('RETURN_CHECK', misc.filename, n, retty))
         return (call, retty)
 
     def visitLambda(self, n, env, misc):
@@ -899,7 +1153,9 @@ class Typechecker(Visitor):
         env = env.copy()
         env.update(dict(list(zip(argnames, params))))
         env.update(dict(specials))
-        body, rty = self.dispatch(n.body, env, misc)
+        # The body runs in a frame of its own, outside the handler
+        # around the statement, as do comprehensions
+        body, rty = self.dispatch(n.body, env, typing.Misc(width_reads=None, extend=misc))
         if n.args.vararg:
             ffrom = DynParameters
         elif n.args.kwarg:
@@ -950,13 +1206,16 @@ class Typechecker(Visitor):
             try:
                 ty = misc.cls.instance().member_type(n.attr)
             except KeyError:
-                if flags.CHECK_ACCESS and not flags.CLOSED_CLASSES and not isinstance(n.ctx, ast.Store):
+                # Only reads from the receiver itself are made directly
+                if flags.CHECK_ACCESS and not flags.CLOSED_CLASSES and not isinstance(n.ctx, ast.Store) and \
+                        not (isinstance(value, ast.Name) and value.id == misc.receiver.id and \
+                                 elided_width_check(n, misc)):
                     value = cast(env, misc.cls, value, misc.cls.instance(), Object(misc.cls.name, {n.attr: Dyn}), 
                                  errmsg('WIDTH_DOWNCAST', misc.filename, n, n.attr), misc=misc)
                 ty = Dyn
             if isinstance(value, ast.Name) and value.id == misc.receiver.id:
                 if flags.SEMANTICS == 'MONO' and not isinstance(n.ctx, ast.Store) and not isinstance(n.ctx, ast.Del) and \
-                        not tyinstance(ty, Dyn):
+                        not tyinstance(ty, Dyn) and not monotonic_invariant(misc.cls, n.attr, ty):
                     ans = ast.Call(func=ast.Name(id='retic_getattr_'+('static' if ty.static() else 'dynamic'), 
                                                  ctx=ast.Load(), lineno=n.lineno),
                                    args=[value, ast.Str(s=n.attr), ty.to_ast()],
@@ -976,14 +1235,16 @@ class Typechecker(Visitor):
                 if isinstance(n.ctx, ast.Del):
                     return error(errmsg('TYPED_ATTR_DELETE', misc.filename, n, n.attr, ty), lineno=n.lineno), Dyn
             except KeyError:
-                if flags.CHECK_ACCESS and not flags.CLOSED_CLASSES and not isinstance(n.ctx, ast.Store):
+                if flags.CHECK_ACCESS and not flags.CLOSED_CLASSES and not isinstance(n.ctx, ast.Store) and \
+                        not elided_width_check(n, misc):
                     value = cast(env, misc.cls, value, vty, vty.__class__('', {n.attr: Dyn}), 
                                  errmsg('WIDTH_DOWNCAST', misc.filename, n, n.attr), misc=misc)
                 ty = Dyn
         elif tyinstance(vty, Dyn):
             if flags.CHECK_ACCESS and not isinstance(n.ctx, ast.Store) and not isinstance(n.ctx, ast.Del):
-                value = cast(env, misc.cls, value, vty, Record({n.attr: Dyn}), 
-                             errmsg('WIDTH_DOWNCAST', misc.filename, n, n.attr), misc=misc) 
+                if not elided_width_check(n, misc):
+                    value = cast(env, misc.cls, value, vty, Record({n.attr: Dyn}), 
+                                 errmsg('WIDTH_DOWNCAST', misc.filename, n, n.attr), misc=misc) 
             else:
                 value = cast(env, misc.cls, value, vty, Record({}), 
                              errmsg('NON_OBJECT_' + ('WRITE' if isinstance(n.ctx, ast.Store) \
@@ -993,8 +1254,13 @@ class Typechecker(Visitor):
             kind = 'WRITE' if isinstance(n.ctx, ast.Store) else ('DEL' if isinstance(n.ctx, ast.Del) else 'READ')
             return error(errmsg('NON_OBJECT_' + kind, misc.filename, n, n.attr) % static_val(vty), lineno=n.lineno), Dyn
 
+        # A receiver annotated with its own class is read as if it
+        # were typed by Self; a different class that happens to share
+        # the name has a different type
+        own_receiver = tyinstance(vty, Object) and misc.cls and misc.receiver and \
+            isinstance(value, ast.Name) and value.id == misc.receiver.id and vty == misc.cls.instance()
         if flags.SEMANTICS == 'MONO' and not isinstance(n.ctx, ast.Store) and not isinstance(n.ctx, ast.Del) and \
-                not tyinstance(ty, Dyn):
+                not tyinstance(ty, Dyn) and not (own_receiver and monotonic_invariant(misc.cls, n.attr, ty)):
             ans = ast.Call(func=ast.Name(id='retic_getattr_'+('static' if ty.static() else 'dynamic'), 
                                          ctx=ast.Load(), lineno=n.lineno),
                            args=[value, ast.Str(s=n.attr), ty.to_ast()],
@@ -1002,7 +1268,8 @@ class Typechecker(Visitor):
             return ans, ty
 
         ans = ast.Attribute(value=value, attr=n.attr, ctx=n.ctx, lineno=n.lineno)
-        if not isinstance(n.ctx, ast.Store) and not isinstance(n.ctx, ast.Del):
+        if not isinstance(n.ctx, ast.Store) and not isinstance(n.ctx, ast.Del) and \
+                not (own_receiver and monotonic_invariant(misc.cls, n.attr, ty)):
             ans = check(ans, ty, errmsg('ACCESS_CHECK', misc.filename, n, n.attr, ty), ulval=value)
         return ans, ty
 
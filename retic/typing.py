@@ -35,7 +35,9 @@ class Misc(object):
     default = dict(ret = Void, cls = None,
                    receiver = None, methodscope = False,
                    extenv = {}, filename = None, depth = 0,
-                   static = None, gensymmer = [0], typenames={})
+                   static = None, gensymmer = [0], typenames={},
+                   summaries={}, narrowable=frozenset(),
+                   return_types={}, returns=None, width_reads=None)
     def __init__(self, *, extend=None, **kwargs):
         if extend is None:
             class Dummy: pass
@@ -51,6 +53,11 @@ class Misc(object):
         self.static = kwargs.get('static', extend.static)
         self.gensymmer = kwargs.get('gensymmer', extend.gensymmer)
         self.typenames = kwargs.get('typenames', extend.typenames)
+        self.summaries = kwargs.get('summaries', extend.summaries)
+        self.narrowable = kwargs.get('narrowable', extend.narrowable)
+        self.return_types = kwargs.get('return_types', extend.return_types)
+        self.returns = kwargs.get('returns', extend.returns)
+        self.width_reads = kwargs.get('width_reads', extend.width_reads)
 
 # Utilities
 
@@ -0,0 +1,11 @@
+# retic: --closed-world
+def f(x:int)->int:
+    return x + 1
+
+def g(y:int)->int:
+    return f(y)
+
+# g calls f through its unchecked entry point, which skips the argument
+# check that f itself keeps for untyped callers
+print('RESULTS', g(1), 'retic_unchecked_f' in g.__code__.co_names,
+      'check_type_int' in retic_unchecked_f.__code__.co_names, 'check_type_int' in f.__code__.co_names)
@@ -0,0 +1,6 @@
+# retic: --closed-world
+def f(x:int)->int:
+    return x + 1
+
+print(f(1))
+print(eval('f("b")'))
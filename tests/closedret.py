@@ -0,0 +1,18 @@
+# retic: --closed-world
+def f(x)->int:
+    return x
+
+def k(x)->int:
+    return x
+
+def g(y):
+    return f(y) + 1
+
+def h(y):
+    return k(y) + 1
+
+# Spelling k in a string means it might be rebound, so h keeps checking
+# what k returns; g trusts f to have checked its own return
+name = 'k'
+print('RESULTS', g(1), h(1), 'check_type_int' in g.__code__.co_names,
+      'check_type_int' in h.__code__.co_names)
@@ -0,0 +1,8 @@
+# retic: --infer-returns
+def g():
+    return 1
+
+def h()->int:
+    return g() + 1
+
+print('RESULTS', h(), 'check_type_int' in h.__code__.co_names)
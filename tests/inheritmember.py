@@ -0,0 +1,15 @@
+class A:
+    def m(self)->int:
+        return 1
+
+class B(A):
+    def n(self)->int:
+        return 2
+
+class C(B):
+    pass
+
+def use(c:C)->str:
+    return c.m()
+
+print('RESULTS', use(C()))
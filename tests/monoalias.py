@@ -0,0 +1,25 @@
+import pickle
+
+def fill(d:Dict(String, Int), s:Set(Int))->Dict(String, Int):
+    d['b'] = 2
+    s.add(3)
+    return d
+
+def frozen(s:Set(Int))->Set(Int):
+    return s
+
+def pair(t:Tuple(Int, Int))->Tuple(Int, Int):
+    return t
+
+def keep(l:List(Int))->List(Int):
+    l.append(3)
+    return l
+
+d = {'a': 1}
+s = {1}
+l = [1, 2]
+results = [fill(d, s) is d, sorted(d.items()), sorted(s),
+           type(frozen(frozenset([1, 2]))).__name__, pair(l) is l,
+           pickle.loads(pickle.dumps(keep([1, 2]))),
+           sorted(pickle.loads(pickle.dumps(fill(d, s))).items())]
+print('RESULTS', results)
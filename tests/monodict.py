@@ -0,0 +1,43 @@
+def ints(d:Dict(String, Int))->Dict(String, Int):
+    return d
+
+def nums(s:Set(Int))->Set(Int):
+    return s
+
+def put(d:Dict(String, Int), k:String, v:Int):
+    d[k] = v
+
+def bad(c, k, v):
+    try:
+        c[k] = v
+    except BaseException:
+        return 'caught'
+    return 'missed'
+
+def badadd(c, v):
+    try:
+        c.add(v)
+    except BaseException:
+        return 'caught'
+    return 'missed'
+
+def tryints(d):
+    try:
+        ints(d)
+    except BaseException:
+        return 'caught'
+    return 'missed'
+
+d = dict(a=1)
+m = ints(d)
+again = ints(d) is m
+put(m, 'b', 2)
+d['z'] = 'alias'
+s = set([1, 2])
+n = nums(s)
+s.add('alias')
+results = [type(m).__name__, again, ints(m) is m,
+           sorted(m.items()), bad(m, 'c', 'x'), sorted(m.items()),
+           type(n).__name__, nums(n) is n, sorted(n), badadd(n, 'x'), sorted(n),
+           tryints({'a': 'x'})]
+print('RESULTS', results)
@@ -0,0 +1,12 @@
+class C:
+    def __init__(self:C, flag:bool):
+        if flag:
+            self.x = 1
+
+def use(c:{'x': int})->int:
+    return c.x
+
+a = C(True)
+b = C(False)
+use(a)
+print('RESULTS', hasattr(a, 'x'), hasattr(b, 'x'), hasattr(C, 'x'))
@@ -0,0 +1,26 @@
+# Lists typed code alone has seen are left pending when strengthened
+ints = rtypes.List(rtypes.Int)
+
+def pending(*elts):
+    l = mono_datastructures.MonoList(elts, castfunc=retic_cast, error='%s', line=1)
+    l.__monotonic_cast__(ints, '%s', 1)
+    return l
+
+def attempt(op):
+    l = pending([1], [1.5])
+    waiting = l.__pending__ is not None
+    try:
+        op(l)
+    except BaseException:
+        return [waiting, 'caught']
+    return [waiting, 'missed']
+
+def todyn(l):
+    retic_cast(l, rtypes.List(ints), rtypes.Dyn, '%s', line=1)
+
+ok = pending([2], [1])
+ok.sort()
+results = [attempt(lambda l: None), attempt(list), attempt(lambda l: l.sort()),
+           attempt(lambda l: l.append([3])), attempt(todyn),
+           ok.__pending__, ok, list(map(lambda e: type(e).__name__, ok))]
+print('RESULTS', results)
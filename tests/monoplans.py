@@ -0,0 +1,19 @@
+import gc, weakref
+
+def use(c:{'a': int})->int:
+    return c.a
+
+made = weakref.WeakSet()
+
+def make():
+    class K:
+        def __init__(self):
+            self.a = 1
+    use(K())
+    made.add(K)
+
+# Classes made on the fly are not kept alive by the casts of their
+# instances
+make()
+gc.collect()
+print('RESULTS', len(made))
@@ -0,0 +1,36 @@
+def ints(l:List(Int))->List(Int):
+    return l
+
+def floats(l:List(Float))->List(Float):
+    return l
+
+def bools(l:List(Bool))->List(Bool):
+    return l
+
+def strs(l:List(String))->List(String):
+    return l
+
+def nested(l:List(List(Int)))->List(List(Int)):
+    return l
+
+def bad(l, k, v):
+    try:
+        l[k] = v
+    except BaseException:
+        return 'caught'
+    return 'missed'
+
+i = ints([1, 2, 3, 4])
+f = floats([1.5, 2.5])
+b = bools([True, False])
+s = strs(['a', 'b'])
+f[0] = 3
+i[1:3] = [7, 8]
+s[:1] = ['z']
+n = nested([[1], [2]])
+n[:1] = [[3]]
+results = [type(i).__name__, type(f).__name__, type(b).__name__, type(s).__name__,
+           bad(i, 0, 'x'), bad(f, 0, 'x'), bad(b, 0, 'x'), bad(s, 0, 1),
+           bad(i, slice(0, 2), ['x', 'y']), bad(n, slice(0, 1), [['x']]),
+           f[0], i[1:3], i, s, b[-1], n]
+print('RESULTS', results)
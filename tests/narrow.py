@@ -0,0 +1,19 @@
+def s(v:str):
+    return v
+
+def f(x)->int:
+    if isinstance(x, int):
+        return x
+    return 0
+
+def h(x)->int:
+    if isinstance(x, int):
+        if s(x):
+            return x
+    return 0
+
+# f returns x unchecked, since the test proves that it's an int; h
+# passes x where a str is expected, which the narrowed type rules out,
+# so it's typechecked without the narrowing, and checks x as before
+print('RESULTS', f(1), f('a'), h('a'), 'check_type_int' in f.__code__.co_names,
+      'check_type_int' in h.__code__.co_names)
@@ -18,12 +18,19 @@ CALL = (PYVERSION + ' ../retic.py').split()
 print('Starting regression tests.')
 
 
+# A test can ask for other options on its first line, as
+# '# retic: --closed-world'
+def options(file):
+    with open(pyfiles[file], 'r') as program:
+        first = program.readline()
+    return first[len('# retic:'):].split() if first.startswith('# retic:') else []
+
 def test(file, sem, expected):
     exc = False
 
     print('Reticulating {} using {}'.format(file, sem))
     try: 
-        result = subprocess.check_output(CALL + [pyfiles[file]] + [sem], 
+        result = subprocess.check_output(CALL + [pyfiles[file]] + [sem] + options(file), 
                                          stderr=subprocess.STDOUT).decode('utf-8').strip()
     except Exception as e:
         exc = e.output.decode('utf-8').strip()
@@ -0,0 +1,15 @@
+def write(table):
+    try:
+        table['upper'] = rtypes.Int
+    except TypeError:
+        return 'refused'
+    return 'written'
+
+def f(s:str)->str:
+    return s.upper()
+
+f('a')
+s = rtypes.String.structure()
+results = [s is rtypes.String.structure(), write(rtypes.builtin_members[str]),
+           s.members['upper'] == rtypes.Dyn, s.members is not rtypes.builtin_members[str]]
+print('RESULTS', results)